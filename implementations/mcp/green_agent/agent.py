@@ -16,10 +16,20 @@ import agentbeats as ab
 import uvicorn
 import tomllib
 import dotenv
+import asyncio
+import atexit
+import functools
 import json
 import logging
+import logging.handlers
+import orjson
+import os
+import queue
+import random
+import time
 
 from a2a.server.apps import A2AStarletteApplication
+from a2a.server.context import ServerCallContext
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
@@ -32,32 +42,141 @@ from tau_bench.types import SolveResult, RESPOND_ACTION_NAME, Action
 # Import our new tools (local to this implementation)
 from . import tools as green_tools
 
-dotenv.load_dotenv()
+# Use uvloop's libuv-based event loop when available - the evaluation loop is
+# async I/O bound (A2A round-trips, LLM calls, progress logging).
+try:
+    import uvloop  # noqa: F401
+    UVICORN_LOOP = "uvloop"
+except ImportError:
+    UVICORN_LOOP = "asyncio"
+
+# Same for the C-based HTTP protocol parser
+try:
+    import httptools  # noqa: F401
+    UVICORN_HTTP = "httptools"
+except ImportError:
+    UVICORN_HTTP = "auto"
 
 # Configuration
 TAU_TASK_ID = 5  # Change this to test different tasks
 
+# Shared str singletons for the per-task summary lines
+_PASS_EMOJI = "✅"
+_FAIL_EMOJI = "❌"
+_SEP = "=" * 60
+
+# Random-mode task pool (10 tasks per domain assumed, as before)
+_DOMAINS = ("retail", "airline")
+_TASK_RANGE = range(10)
+
+# Default env config template for battle_start messages; resolved once at
+# import so per-request construction is a cheap dict merge.
+_DEFAULT_ENV_CONFIG_BASE = {
+    "env": "retail",
+    "user_strategy": "llm",
+    "user_model": green_tools.TAU_USER_MODEL,
+    "user_provider": green_tools.TAU_USER_PROVIDER,
+    "task_split": "test",
+}
+
+# Directory this module lives in (agent-card TOML sits next to it)
+_MODULE_DIR = Path(__file__).parent
+
 # Set up logging
-log_file = Path(__file__).parent.parent / "green_agent.log"
+log_file = _MODULE_DIR.parent / "green_agent.log"
 # Ensure directory exists
 log_file.parent.mkdir(parents=True, exist_ok=True)
+# Route all records through a queue so the per-step logger calls never block
+# the asyncio event loop on disk/stderr flushes; a background listener thread
+# drains the queue into the real handlers.
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler(log_file)
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+# Console only carries warnings/errors; the full INFO trail goes to the file
+_stream_handler.setLevel(logging.WARNING)
+# GREEN_LOG_LEVEL=WARNING quiets the INFO trail in production; handlers are
+# cheap to skip entirely when the level gates the record out.
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
+    level=os.environ.get("GREEN_LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _file_handler, _stream_handler, respect_handler_level=True
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger("green_agent")
 
 
+class ShardedTaskStore(InMemoryTaskStore):
+    """
+    InMemoryTaskStore variant that shards tasks across independent locks.
+
+    The stock store funnels every read/write through a single asyncio.Lock;
+    once tasks and pass@k attempts run concurrently that lock is a small but
+    needless serialization point. Sharding by task id gives each slice of
+    the id space its own dict and lock.
+    """
+
+    _NUM_SHARDS = 16
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._shards = [{} for _ in range(self._NUM_SHARDS)]
+        self._shard_locks = [asyncio.Lock() for _ in range(self._NUM_SHARDS)]
+
+    def _shard_index(self, task_id: str) -> int:
+        return hash(task_id) & (self._NUM_SHARDS - 1)
+
+    async def save(self, task, context: ServerCallContext | None = None) -> None:
+        i = self._shard_index(task.id)
+        async with self._shard_locks[i]:
+            self._shards[i][task.id] = task
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None):
+        i = self._shard_index(task_id)
+        async with self._shard_locks[i]:
+            return self._shards[i].get(task_id)
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        i = self._shard_index(task_id)
+        async with self._shard_locks[i]:
+            self._shards[i].pop(task_id, None)
+
+
+@functools.lru_cache(maxsize=None)
 def load_agent_card_toml(agent_name):
-    """Load agent card from TOML file."""
-    current_dir = __file__.rsplit("/", 1)[0]
-    with open(f"{current_dir}/{agent_name}.toml", "rb") as f:
-        return tomllib.load(f)
+    """Load agent card from TOML file (cached - the file never changes at runtime).
+
+    Callers that modify the result should copy it first so the cached dict
+    stays pristine.
+    """
+    return tomllib.loads((_MODULE_DIR / f"{agent_name}.toml").read_bytes().decode())
+
+
+async def _emit_error(event_queue, message: str) -> None:
+    """Enqueue an error notice when an event queue is attached."""
+    if event_queue:
+        await event_queue.enqueue_event(new_agent_text_message(message))
+
+
+async def _heartbeat(event_queue: EventQueue, interval: float = 15.0) -> None:
+    """Enqueue a short keepalive message every `interval` seconds.
+
+    The step telemetry goes quiet while a white-agent call is in flight
+    (up to its full timeout); behind a Cloudflare tunnel that idle gap is
+    long enough for the edge to close the stream with a 524. Runs until
+    cancelled by the caller.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await event_queue.enqueue_event(
+            new_agent_text_message("⏳ Evaluation still in progress...")
+        )
 
 
 async def evaluate_agent_with_tau_bench(
@@ -89,47 +208,62 @@ async def evaluate_agent_with_tau_bench(
         )
 
     total_cost = 0.0
-    env_reset_res = env.reset(task_index=task_index)
+    # env.reset/env.step are sync tau-bench calls (and may call the user-sim
+    # LLM); run them on a worker thread so the event loop keeps serving
+    # heartbeats and other battles.
+    env_reset_res = await asyncio.to_thread(env.reset, task_index=task_index)
     obs = env_reset_res.observation
     info = env_reset_res.info.model_dump()
     reward = 0.0
 
-    # Create initial task description with tools
-    task_description = f"""
+    # Create initial task description with tools. The wiki + tools_info block
+    # is constant for the env, so it is built separately from the per-attempt
+    # observation: the white agent sees a byte-stable prefix across attempts
+    # and steps, which is what provider prefix caching keys on. Compact JSON
+    # (no indent) - the schema is for the LLM, pretty-printing just costs tokens.
+    task_prefix = f"""
 {env.wiki}
 Here's a list of tools you can use (you can use at most one tool at a time):
-{json.dumps(env.tools_info, indent=2)}
+{orjson.dumps(env.tools_info).decode()}
 Please response in the JSON format. Please wrap the JSON part with <json>...</json> tags.
 The JSON should contain:
 - "name": the tool call function name, or "{RESPOND_ACTION_NAME}" if you want to respond directly.
 - "kwargs": the arguments for the tool call, or {{"content": "your message here"}} if you want to respond directly.
 
 Next, I'll provide you with the user message and tool call results.
-User message: {obs}
-    """
+"""
+    task_description = f"{task_prefix}User message: {obs}"
 
     next_green_message = task_description
     context_id = None
 
     # Evaluation loop
     for step_num in range(max_num_steps):
-        # Log progress using AgentBeats SDK
+        # Log progress using AgentBeats SDK. The telemetry calls are
+        # independent of each other and of the white-agent RPC, so fan them
+        # out concurrently instead of serializing their latency into the step.
+        telemetry = []
         if battle_id and backend_url:
-            await green_tools.log_battle_progress(
+            telemetry.append(green_tools.log_battle_progress(
                 f"Evaluation step {step_num + 1}/{max_num_steps}...",
                 battle_id=battle_id,
                 backend_url=backend_url,
                 step=step_num + 1,
                 total_steps=max_num_steps
-            )
+            ))
 
         if event_queue:
-            await event_queue.enqueue_event(
+            telemetry.append(event_queue.enqueue_event(
                 new_agent_text_message(f"Evaluation step {step_num + 1}/{max_num_steps}...")
-            )
+            ))
 
-        logger.info(f"Step {step_num + 1}/{max_num_steps}: Sending message to white agent (ctx_id={context_id})")
-        logger.info(f"Green agent message (task):\n{next_green_message[:500]}...")
+        if telemetry:
+            await asyncio.gather(*telemetry)
+
+        # Lazy %-formatting: the message string is only built if the record
+        # actually passes the level filter.
+        logger.info("Step %d/%d: Sending message to white agent (ctx_id=%s)", step_num + 1, max_num_steps, context_id)
+        logger.debug("Green agent message (task):\n%.500s...", next_green_message)
 
         # Send message using our tools (which use AgentBeats SDK under the hood)
         try:
@@ -144,10 +278,7 @@ User message: {obs}
                 error_msg = result.get("error", "Unknown error")
                 logger.error(f"White agent returned error: {error_msg}")
 
-                if event_queue:
-                    await event_queue.enqueue_event(
-                        new_agent_text_message(f"White agent error at step {step_num + 1}: {error_msg}")
-                    )
+                await _emit_error(event_queue, f"White agent error at step {step_num + 1}: {error_msg}")
 
                 return SolveResult(
                     reward=0.0,
@@ -180,13 +311,10 @@ User message: {obs}
 
         except Exception as e:
             error_msg = "Communication error with white agent"
-            error_detail = f"Exception: {type(e).__name__}: {str(e)}"
+            error_detail = f"Exception: {type(e).__name__}: {e}"
             logger.error(f"{error_msg}. {error_detail}", exc_info=True)
 
-            if event_queue:
-                await event_queue.enqueue_event(
-                    new_agent_text_message(f"Error at step {step_num + 1}: {error_msg}")
-                )
+            await _emit_error(event_queue, f"Error at step {step_num + 1}: {error_msg}")
 
             return SolveResult(
                 reward=0.0,
@@ -206,13 +334,14 @@ User message: {obs}
         assert len(text_parts) == 1, "Expecting exactly one text part from the white agent"
 
         white_text = text_parts[0]
-        logger.info(f"White agent response received ({len(white_text)} chars)")
-        logger.info(f"White agent response (raw):\n{white_text}")
+        logger.info("White agent response received (%d chars)", len(white_text))
+        logger.debug("White agent response (raw):\n%s", white_text)
 
         # Log to AgentBeats if available
         if battle_id and backend_url:
+            preview = white_text if len(white_text) <= 500 else white_text[:500] + "..."
             await green_tools.log_battle_progress(
-                f"⚪ **White Agent Response (Step {step_num + 1})**\n```\n{white_text[:500]}{'...' if len(white_text) > 500 else ''}\n```",
+                f"⚪ **White Agent Response (Step {step_num + 1})**\n```\n{preview}\n```",
                 battle_id=battle_id,
                 backend_url=backend_url
             )
@@ -224,10 +353,7 @@ User message: {obs}
             error_detail = f"Response preview: {white_text[:300]}"
             logger.error(f"{error_msg}. {error_detail}")
 
-            if event_queue:
-                await event_queue.enqueue_event(
-                    new_agent_text_message(f"Error at step {step_num + 1}: White agent response missing <json> tags")
-                )
+            await _emit_error(event_queue, f"Error at step {step_num + 1}: White agent response missing <json> tags")
 
             return SolveResult(
                 reward=0.0,
@@ -238,17 +364,14 @@ User message: {obs}
 
         action_json = white_tags
         try:
-            action_dict = json.loads(action_json)
+            action_dict = orjson.loads(action_json)
             action = Action(**action_dict)
         except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
             error_msg = "White agent returned invalid JSON format"
-            error_detail = f"JSON parse error: {str(e)}. Content: {action_json[:300]}"
+            error_detail = f"JSON parse error: {e}. Content: {action_json[:300]}"
             logger.error(f"{error_msg}. {error_detail}")
 
-            if event_queue:
-                await event_queue.enqueue_event(
-                    new_agent_text_message(f"Error at step {step_num + 1}: Invalid JSON in white agent response")
-                )
+            await _emit_error(event_queue, f"Error at step {step_num + 1}: Invalid JSON in white agent response")
 
             return SolveResult(
                 reward=0.0,
@@ -257,22 +380,19 @@ User message: {obs}
                 total_cost=total_cost,
             )
 
-        # Execute action in tau-bench environment
-        env_response = env.step(action)
+        # Execute action in tau-bench environment (off-loop, see reset above)
+        env_response = await asyncio.to_thread(env.step, action)
         reward = env_response.reward
-        info = {**info, **env_response.info.model_dump()}
+        # In-place merge: rebuilding the dict each step re-copies every
+        # accumulated key (O(n^2) over the loop)
+        info.update(env_response.info.model_dump())
 
-        # Prepare next message
+        # Prepare next message - flat strings, no template whitespace around
+        # the observation (tokens the white agent would just pay for)
         if action.name != RESPOND_ACTION_NAME:
-            next_green_message = f"""
-Tool call result:
-{env_response.observation}
-            """
+            next_green_message = f"Tool call result:\n{env_response.observation}"
         else:
-            next_green_message = f"""
-User message:
-{env_response.observation}
-            """
+            next_green_message = f"User message:\n{env_response.observation}"
 
         if env_response.done:
             break
@@ -288,19 +408,32 @@ User message:
 class TauGreenAgentExecutor(AgentExecutor):
     """
     Green agent executor for tau-bench evaluations.
-    
+
     VERSION using AgentBeats SDK patterns with pass@k support.
     """
 
-    def __init__(self, agent_card_path: str = "tau_green_agent_mcp"):
-        """Initialize executor and load pass@k config from TOML."""
-        import tomllib
-
-        current_dir = Path(__file__).parent
-        toml_path = current_dir / f"{agent_card_path}.toml"
+    # Fixed attribute set: slot descriptors turn the frequent self._* reads in
+    # execute() into C-level offset loads and catch attribute typos. (The a2a
+    # base class still carries a __dict__, so this isn't a memory play.)
+    __slots__ = (
+        "pass_k_config",
+        "active_battles",
+        "active_battle_ttl",
+        "_mode",
+        "_k",
+        "_k_half",
+        "_domain",
+        "_task_id",
+        "_num_battles",
+        "_reset_between_attempts",
+        "_max_concurrency",
+        "_max_concurrent_tasks",
+        "_early_exit",
+    )
 
-        with open(toml_path, "rb") as f:
-            config = tomllib.load(f)
+    def __init__(self, agent_card_path: str = "tau_green_agent_mcp"):
+        """Initialize executor and load pass@k config from TOML (parsed once, cached)."""
+        config = load_agent_card_toml(agent_card_path)
 
         self.pass_k_config = config.get("pass_k_config", {
             "mode": "manual",
@@ -309,20 +442,42 @@ class TauGreenAgentExecutor(AgentExecutor):
             "task_id": 5,
             "num_battles": 5
         })
-        
-        # Track active battles to prevent duplicate processing
-        self.active_battles = set()  # Set of battle_ids currently being processed
+
+        # The config is immutable after load, so hoist the lookups execute()
+        # needs out of the hot path into plain attributes.
+        self._mode = self.pass_k_config.get("mode", "manual")
+        self._k = int(self.pass_k_config.get("k", 4))
+        self._k_half = self._k // 2
+        self._domain = self.pass_k_config.get("domain", "retail")
+        self._task_id = int(self.pass_k_config.get("task_id", 5))
+        self._num_battles = int(self.pass_k_config.get("num_battles", 5))
+        self._reset_between_attempts = bool(self.pass_k_config.get("reset_between_attempts", False))
+        self._max_concurrency = int(self.pass_k_config.get("max_concurrency", 1))
+        self._max_concurrent_tasks = int(self.pass_k_config.get("max_concurrent_tasks", 1))
+        self._early_exit = bool(self.pass_k_config.get("early_exit", False))
+
+        # Track active battles to prevent duplicate processing. Maps
+        # battle_id -> monotonic start time; entries past the TTL count as
+        # abandoned, so a crashed evaluation can't pin its battle_id forever
+        # or block a retry of the same battle.
+        self.active_battles = {}
+        self.active_battle_ttl = float(config.get("battle_timeout", 1050)) + 60.0
 
         logger.info(f"Loaded pass@k config: {self.pass_k_config}")
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         logger.info("=== Green agent received task ===")
         user_input = context.get_user_input()
-        logger.info(f"Received user_input: {user_input[:500]}")
+        logger.info("Received user_input: %.500s", user_input)
 
-        # Parse input - try JSON first (AgentBeats format)
+        # Parse input - try JSON first (AgentBeats format), but discriminate on
+        # the first non-whitespace character so plain-text direct-launch
+        # payloads don't pay for a doomed json.loads before the XML scan.
+        stripped_input = user_input.lstrip()
         try:
-            battle_info = json.loads(user_input)
+            if stripped_input[:1] not in "{[":
+                raise json.JSONDecodeError("Input does not start with JSON", user_input, 0)
+            battle_info = orjson.loads(stripped_input)
             msg_type = battle_info.get("type")
             battle_id = battle_info.get("battle_id")
 
@@ -336,35 +491,33 @@ class TauGreenAgentExecutor(AgentExecutor):
                 return
 
             elif msg_type == "battle_start":
-                # Check for duplicate battle_start request
-                if battle_id and battle_id in self.active_battles:
-                    logger.info(f"⚠️  Duplicate battle_start for {battle_id} - already processing, returning acknowledgment")
-                    await event_queue.enqueue_event(
-                        new_agent_text_message(f"Battle {battle_id} already in progress")
-                    )
-                    return
-                
+                # Check for duplicate battle_start request (stale entries past
+                # the TTL don't count - their evaluation is long gone)
+                if battle_id:
+                    started_at = self.active_battles.get(battle_id)
+                    if started_at is not None and (time.monotonic() - started_at) < self.active_battle_ttl:
+                        logger.info(f"⚠️  Duplicate battle_start for {battle_id} - already processing, returning acknowledgment")
+                        await event_queue.enqueue_event(
+                            new_agent_text_message(f"Battle {battle_id} already in progress")
+                        )
+                        return
+
                 # Mark battle as active NOW (when we're actually starting work)
                 if battle_id:
-                    self.active_battles.add(battle_id)
+                    self.active_battles[battle_id] = time.monotonic()
                     logger.info(f"✅ Added battle {battle_id} to active set, starting evaluation")
                 # AgentBeats battle start format
                 logger.info("Received battle_start message")
-                opponent_infos = battle_info.get("opponent_infos", [])
-                if opponent_infos:
-                    white_agent_url = opponent_infos[0].get("agent_url")
-                else:
+                # EAFP: battle_start payloads carry opponent_infos in the
+                # overwhelmingly common case, so one indexing chain beats
+                # membership checks plus defaulted .get() calls
+                try:
+                    white_agent_url = battle_info["opponent_infos"][0]["agent_url"]
+                except (KeyError, IndexError, TypeError):
                     raise ValueError("No opponent_infos in battle_start message")
 
                 # Use configuration from battle or defaults
-                env_config = {
-                    "env": "retail",
-                    "user_strategy": "llm",
-                    "user_model": green_tools.TAU_USER_MODEL,
-                    "user_provider": green_tools.TAU_USER_PROVIDER,
-                    "task_split": "test",
-                    "task_ids": [TAU_TASK_ID],
-                }
+                env_config = {**_DEFAULT_ENV_CONFIG_BASE, "task_ids": [TAU_TASK_ID]}
             else:
                 raise json.JSONDecodeError(f"Unknown message type: {msg_type}", user_input, 0)
 
@@ -373,7 +526,7 @@ class TauGreenAgentExecutor(AgentExecutor):
             logger.info(f"JSON parse failed ({e}), trying XML tag parsing")
             white_agent_url = green_tools.parse_xml_tags(user_input, "white_agent_url")
             env_config_str = green_tools.parse_xml_tags(user_input, "env_config")
-            env_config = json.loads(env_config_str)
+            env_config = orjson.loads(env_config_str)
             battle_info = {}  # No battle info in this case
 
         logger.info(f"Using white_agent_url: {white_agent_url}")
@@ -383,93 +536,126 @@ class TauGreenAgentExecutor(AgentExecutor):
         backend_url = battle_info.get("backend_url") or battle_info.get("green_battle_context", {}).get("backend_url")
 
         # Determine evaluation mode and task selection
-        mode = self.pass_k_config.get("mode", "manual")
-        k = self.pass_k_config.get("k", 4)
+        mode = self._mode
+        k = self._k
 
         logger.info(f"Pass@k evaluation mode: {mode}, k={k}")
-        await event_queue.enqueue_event(
-            new_agent_text_message(f"🎯 Pass@k evaluation mode: {mode} (k={k})")
-        )
+
+        # Coalesce the mode banner and task selection details into one
+        # message so the opening phase costs a single enqueue/await.
+        opening = f"🎯 Pass@k evaluation mode: {mode} (k={k})"
 
         if mode == "manual":
             # Manual mode: Use config from TOML
-            domain = self.pass_k_config.get("domain", "retail")
-            task_id = self.pass_k_config.get("task_id", 5)
+            domain = self._domain
+            task_id = self._task_id
             tasks_to_evaluate = [(domain, task_id)]
 
             logger.info(f"Manual mode: Evaluating domain={domain}, task_id={task_id}")
-            await event_queue.enqueue_event(
-                new_agent_text_message(f"📋 Manual mode: {domain} task {task_id}")
-            )
+            opening += f"\n📋 Manual mode: {domain} task {task_id}"
 
         elif mode == "random":
-            # Random mode: Generate random task selections
-            import random
-
-            num_battles = self.pass_k_config.get("num_battles", 5)
-            domains = ["retail", "airline"]
-            task_range = list(range(10))  # Assuming 10 tasks per domain
-
-            tasks_to_evaluate = [
-                (random.choice(domains), random.choice(task_range))
-                for _ in range(num_battles)
-            ]
+            # Random mode: Generate random task selections in two C-level
+            # draws instead of 2N Python-level random.choice calls
+            num_battles = self._num_battles
+            tasks_to_evaluate = list(zip(
+                random.choices(_DOMAINS, k=num_battles),
+                random.choices(_TASK_RANGE, k=num_battles),
+            ))
 
             logger.info(f"Random mode: Generated {num_battles} random tasks")
-            await event_queue.enqueue_event(
-                new_agent_text_message(
-                    f"🎲 Random mode: {num_battles} random tasks\n" +
-                    "\n".join([f"  - {d} task {t}" for d, t in tasks_to_evaluate])
-                )
+            opening += (
+                f"\n🎲 Random mode: {num_battles} random tasks\n" +
+                "\n".join([f"  - {d} task {t}" for d, t in tasks_to_evaluate])
             )
 
         else:
             raise ValueError(f"Unknown evaluation mode: {mode}")
 
-        # Run pass@k evaluation on selected tasks
-        all_results = []
+        await event_queue.enqueue_event(new_agent_text_message(opening))
 
-        for idx, (domain, task_id) in enumerate(tasks_to_evaluate):
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Evaluating {idx + 1}/{len(tasks_to_evaluate)}: {domain} task {task_id}")
-            logger.info(f"{'='*60}\n")
+        # Run pass@k evaluation on selected tasks. Tasks are independent, so
+        # they are dispatched together under a bounded semaphore
+        # (max_concurrent_tasks in the TOML). The default of 1 keeps the
+        # sequential behaviour and lets evaluations share the per-domain env
+        # cache; above 1, each evaluation constructs a private env.
+        task_concurrency = max(1, self._max_concurrent_tasks)
+        task_semaphore = asyncio.Semaphore(task_concurrency)
+        total_to_evaluate = len(tasks_to_evaluate)
 
-            await event_queue.enqueue_event(
-                new_agent_text_message(
-                    f"\n--- Task {idx + 1}/{len(tasks_to_evaluate)}: {domain} task {task_id} ---"
+        async def _evaluate_task(idx: int, domain: str, task_id: int):
+            async with task_semaphore:
+                # One record per banner: each logger call pays a lock acquire
+                # and a queue put, so the framed header goes out as one message
+                logger.info("\n%s\nEvaluating %d/%d: %s task %s\n%s\n",
+                            _SEP, idx + 1, total_to_evaluate, domain, task_id, _SEP)
+
+                await event_queue.enqueue_event(
+                    new_agent_text_message(
+                        f"\n--- Task {idx + 1}/{total_to_evaluate}: {domain} task {task_id} ---"
+                    )
                 )
-            )
 
-            # Run pass@k evaluation using our tool
-            # Allow optional control of white-agent restarts between attempts via TOML
-            reset_between_attempts = bool(self.pass_k_config.get("reset_between_attempts", False))
-            results = await green_tools.evaluate_agent_with_pass_k(
-                white_agent_url=white_agent_url,
-                domain=domain,
-                task_id=task_id,
-                k=k,
-                max_num_steps=30,
-                reset_between_attempts=reset_between_attempts,
-                battle_id=battle_id,
-                backend_url=backend_url
-            )
+                # Run pass@k evaluation using our tool
+                # White-agent restarts between attempts remain controllable via TOML
+                return await green_tools.evaluate_agent_with_pass_k(
+                    white_agent_url=white_agent_url,
+                    domain=domain,
+                    task_id=task_id,
+                    k=k,
+                    max_num_steps=30,
+                    reset_between_attempts=self._reset_between_attempts,
+                    max_concurrency=self._max_concurrency,
+                    use_cached_env=(task_concurrency == 1),
+                    early_exit=self._early_exit,
+                    battle_id=battle_id,
+                    backend_url=backend_url
+                )
 
-            all_results.append(results)
+        # Keepalive runs for the whole evaluation so the stream never idles
+        # long enough for a tunnel/proxy timeout, then is torn down before
+        # the summary is emitted.
+        heartbeat_task = asyncio.create_task(_heartbeat(event_queue))
+        try:
+            all_results = list(await asyncio.gather(
+                *[_evaluate_task(idx, domain, task_id)
+                  for idx, (domain, task_id) in enumerate(tasks_to_evaluate)]
+            ))
+        finally:
+            heartbeat_task.cancel()
+            await asyncio.gather(heartbeat_task, return_exceptions=True)
 
         # Generate aggregate summary across all evaluated tasks
-        logger.info("\n" + "="*60)
-        logger.info("PASS@K EVALUATION SUMMARY")
-        logger.info("="*60)
+        logger.info("\n%s\nPASS@K EVALUATION SUMMARY\n%s", _SEP, _SEP)
 
         total_tasks = len(all_results)
-        overall_pass_k = sum(r["pass_k"] for r in all_results) / total_tasks if total_tasks > 0 else 0
-        overall_pass_k_half = sum(r["pass_k_half"] for r in all_results) / total_tasks if total_tasks > 0 else 0
-        overall_success_rate = sum(r["success_rate"] for r in all_results) / total_tasks if total_tasks > 0 else 0
-
-        logger.info(f"Tasks evaluated: {total_tasks}")
-        logger.info(f"Overall pass^{k}: {overall_pass_k:.1%}")
-        logger.info(f"Overall pass^{k//2}: {overall_pass_k_half:.1%}")
-        logger.info(f"Overall success rate: {overall_success_rate:.1%}")
+        # Single pass over the results: accumulate every metric and format the
+        # per-task summary row while the dict is already in hand
+        pass_k_count = pass_k_half_count = success_rate_sum = 0
+        per_task_rows = []
+        for idx, r in enumerate(all_results):
+            pass_k_count += r["pass_k"]
+            pass_k_half_count += r["pass_k_half"]
+            success_rate_sum += r["success_rate"]
+            per_task_rows.append(
+                f"{idx + 1}. {r['domain']} task {r['task_id']}: "
+                f"{_PASS_EMOJI if r['pass_k'] else _FAIL_EMOJI} pass^{k}={r['pass_k']}, "
+                f"success_rate={r['success_rate']:.0%}"
+            )
+        overall_pass_k = pass_k_count / total_tasks if total_tasks > 0 else 0
+        overall_pass_k_half = pass_k_half_count / total_tasks if total_tasks > 0 else 0
+        overall_success_rate = success_rate_sum / total_tasks if total_tasks > 0 else 0
+
+        # The summary text needs these formatted anyway, so build each
+        # percentage string once and share it with the log lines
+        pk_pct = f"{overall_pass_k * 100:.1f}%"
+        pkh_pct = f"{overall_pass_k_half * 100:.1f}%"
+        sr_pct = f"{overall_success_rate * 100:.1f}%"
+
+        logger.info(
+            "Tasks evaluated: %d\nOverall pass^%d: %s\nOverall pass^%d: %s\nOverall success rate: %s",
+            total_tasks, k, pk_pct, self._k_half, pkh_pct, sr_pct,
+        )
 
         # Send final summary to event queue
         summary_lines = [
@@ -481,21 +667,14 @@ class TauGreenAgentExecutor(AgentExecutor):
             f"**Attempts per task (k)**: {k}",
             "",
             "## Overall Results",
-            f"- **pass^{k}**: {overall_pass_k:.1%} ({sum(r['pass_k'] for r in all_results)}/{total_tasks} tasks)",
-            f"- **pass^{k//2}**: {overall_pass_k_half:.1%} ({sum(r['pass_k_half'] for r in all_results)}/{total_tasks} tasks)",
-            f"- **Success Rate**: {overall_success_rate:.1%}",
+            f"- **pass^{k}**: {pk_pct} ({pass_k_count}/{total_tasks} tasks)",
+            f"- **pass^{self._k_half}**: {pkh_pct} ({pass_k_half_count}/{total_tasks} tasks)",
+            f"- **Success Rate**: {sr_pct}",
             "",
-            "## Per-Task Summary"
+            "## Per-Task Summary",
+            *per_task_rows,
         ]
 
-        for idx, result in enumerate(all_results):
-            pass_k_emoji = "✅" if result["pass_k"] else "❌"
-            summary_lines.append(
-                f"{idx + 1}. {result['domain']} task {result['task_id']}: "
-                f"{pass_k_emoji} pass^{k}={result['pass_k']}, "
-                f"success_rate={result['success_rate']:.0%}"
-            )
-
         await event_queue.enqueue_event(
             new_agent_text_message("\n".join(summary_lines))
         )
@@ -530,15 +709,13 @@ class TauGreenAgentExecutor(AgentExecutor):
             logger.info(f"Battle result recorded to AgentBeats. Winner: {winner}")
             
             # Clean up: Remove battle from active set
-            if battle_id in self.active_battles:
-                self.active_battles.remove(battle_id)
+            if self.active_battles.pop(battle_id, None) is not None:
                 logger.info(f"✅ Removed battle {battle_id} from active set")
         else:
             logger.info(f"No battle context - skipping AgentBeats result recording. Winner would be: {winner}")
             
             # Still clean up if we have a battle_id
-            if battle_id and battle_id in self.active_battles:
-                self.active_battles.remove(battle_id)
+            if battle_id and self.active_battles.pop(battle_id, None) is not None:
                 logger.info(f"✅ Removed battle {battle_id} from active set")
 
         logger.info(f"Pass@k evaluation complete! Winner: {winner}")
@@ -552,6 +729,36 @@ class TauGreenAgentExecutor(AgentExecutor):
         pass
 
 
+def _load_agent_card(agent_name: str, url: str) -> AgentCard:
+    """
+    Build the validated AgentCard, reusing a cached serialization when fresh.
+
+    Pydantic validation of the card is repeated for every worker/restart even
+    though the TOML rarely changes; a JSON sidecar newer than the TOML lets
+    model_validate_json take the fast path, and the per-run url is patched in
+    with model_copy (no re-validation). Any cache problem falls back to a
+    full build.
+    """
+    toml_path = _MODULE_DIR / f"{agent_name}.toml"
+    cache_path = _MODULE_DIR / f".{agent_name}.card.cache.json"
+
+    try:
+        if cache_path.stat().st_mtime > toml_path.stat().st_mtime:
+            cached = AgentCard.model_validate_json(cache_path.read_bytes())
+            return cached.model_copy(update={"url": url})
+    except (OSError, ValueError):
+        pass
+
+    agent_card_dict = dict(load_agent_card_toml(agent_name))
+    agent_card_dict["url"] = url
+    agent_card = AgentCard(**agent_card_dict)
+    try:
+        cache_path.write_bytes(agent_card.model_dump_json().encode())
+    except OSError:
+        pass
+    return agent_card
+
+
 def start_green_agent(agent_name="tau_green_agent_mcp", host="localhost", port=9006):
     """
     Start the green agent server.
@@ -559,18 +766,56 @@ def start_green_agent(agent_name="tau_green_agent_mcp", host="localhost", port=9
     VERSION using AgentBeats SDK patterns.
     """
     print("Starting green agent (mcp ready version)...")
-    agent_card_dict = load_agent_card_toml(agent_name)
+
+    # Load .env at startup instead of import time, once per process. Pointing
+    # dotenv at the repo root (where the README puts .env, three levels above
+    # this module) skips its upward directory walk.
+    if not os.environ.get("_DOTENV_LOADED"):
+        dotenv.load_dotenv(_MODULE_DIR.parent.parent.parent / ".env", override=False)
+        os.environ["_DOTENV_LOADED"] = "1"
+
     url = f"http://{host}:{port}"
-    agent_card_dict["url"] = url
+    agent_card = _load_agent_card(agent_name, url)
 
     request_handler = DefaultRequestHandler(
         agent_executor=TauGreenAgentExecutor(),
-        task_store=InMemoryTaskStore(),
+        task_store=ShardedTaskStore(),
     )
 
     app = A2AStarletteApplication(
-        agent_card=AgentCard(**agent_card_dict),
+        agent_card=agent_card,
         http_handler=request_handler,
     )
 
-    uvicorn.run(app.build(), host=host, port=port)
+    starlette_app = app.build()
+    # Close the pooled white-agent httpx client when the server stops
+    starlette_app.add_event_handler("shutdown", green_tools.close_httpx_client)
+
+    # Warm the per-domain env cache in the background so the first battle
+    # doesn't pay tau-bench's task-list/wiki load inside its response window.
+    # GREEN_WARMUP=0 skips it (e.g. when iterating on startup itself).
+    if os.environ.get("GREEN_WARMUP", "1") != "0":
+        async def _warm_env_cache():
+            for domain in _DOMAINS:
+                try:
+                    await asyncio.to_thread(green_tools._get_cached_env, domain)
+                    logger.info("Warmed %s env cache", domain)
+                except Exception as e:
+                    logger.warning("Env cache warmup failed for %s: %s", domain, e)
+
+        starlette_app.add_event_handler(
+            "startup", lambda: asyncio.create_task(_warm_env_cache())
+        )
+
+    # uvloop + httptools keep the request path in C; uvicorn's own access/INFO
+    # logging is turned off since the agent does its own structured logging.
+    server_config = uvicorn.Config(
+        starlette_app,
+        host=host,
+        port=port,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
+        log_level="warning",
+        access_log=False,
+    )
+    uvicorn.Server(server_config).run()
@@ -6,9 +6,18 @@ This module exposes tau-bench evaluation tools using the AgentBeats SDK.
 These tools can be used directly by agents or exposed through MCP servers.
 """
 
+import asyncio
+import concurrent.futures
+import functools
 import json
 import logging
+import os
+import random
+import re
+import secrets
 import sys
+import time
+from collections import Counter
 from typing import Dict, Any, Optional, TYPE_CHECKING
 
 # ============================================================================
@@ -19,11 +28,19 @@ from implementations.mcp.shared_config import USE_PROVIDER, TAU_USER_MODEL, TAU_
 
 # NOW import tau-bench (after LiteLLM is configured)
 import agentbeats as ab
+import orjson
 from tau_bench.envs import get_env
 from tau_bench.types import RESPOND_ACTION_NAME, Action
 
-# Import AgentCard for type annotation
-from a2a.types import AgentCard
+# a2a client/types are hoisted to module scope: send_message_to_white_agent
+# runs inside a 30-step loop and per-call imports, while cached in
+# sys.modules, still pay the import-machinery lookups every invocation
+from a2a.client import A2AClient, A2ACardResolver
+from a2a.types import (
+    AgentCard, Message, MessageSendParams, Part, Role,
+    SendMessageRequest, SendMessageSuccessResponse, TextPart,
+)
+from a2a.utils import get_text_parts
 import httpx  # Pre-import httpx to avoid per-call import overhead/hangs
 
 if TYPE_CHECKING:
@@ -36,34 +53,138 @@ logger = logging.getLogger("green_agent.tools")
 # HTTP CLIENT CONFIGURATION
 # ============================================================================
 
-# Cache agent card to avoid repeated fetches
-_cached_agent_card: Optional[AgentCard] = None
-_card_cache_url: Optional[str] = None
+# Agent-card cache keyed by URL with a TTL, plus a per-URL lock so concurrent
+# attempts against the same white agent share one fetch (single-flight)
+# instead of racing duplicate card requests.
+_CARD_TTL = 300.0
+_card_cache: Dict[str, tuple] = {}  # url -> (monotonic fetch time, AgentCard)
+_card_locks: Dict[str, Any] = {}  # url -> asyncio.Lock
+
+# Precompiled once; reset_white_agent re-parses the same URL on every restart.
+_AGENT_URL_RE = re.compile(r'https?://([^:]+):(\d+)')
+
+# Retries for a single white-agent send before the attempt is failed
+_SEND_MAX_RETRIES = 3
+
+# Shared connection pool for all white-agent traffic. Keeping the TCP session
+# alive across the 30 steps x k attempts of an evaluation avoids paying a new
+# handshake per step. The historical hangs that motivated per-call clients came
+# from connections outliving a white-agent restart; those are handled by
+# retiring the pool in reset_white_agent, and keepalive_expiry bounds how long
+# an idle connection can go stale in between.
+_pooled_client: Optional["httpx.AsyncClient"] = None
+
+# Debug escape hatch: set GREEN_HTTP_NO_KEEPALIVE=1 to forbid connection reuse
+# (every request dials a fresh socket, like the old per-call clients) when
+# chasing suspected stale-connection bugs.
+_NO_KEEPALIVE = os.environ.get("GREEN_HTTP_NO_KEEPALIVE") == "1"
+
+# Read-timeout backstop for the pooled client. The client is shared by every
+# caller, so its timeout must cover the slowest legitimate request (a white
+# agent step that waits out its own 60s LLM timeout plus A2A overhead);
+# actual per-call deadlines are the asyncio.wait_for / per-request timeout=
+# at the call sites.
+_POOL_READ_TIMEOUT = 180.0
+
+def _get_httpx_client() -> "httpx.AsyncClient":
+    """
+    Return the shared pooled httpx client, creating it on first use.
+
+    Per-request deadlines are enforced at the call sites via asyncio.wait_for
+    / explicit timeout= arguments; the client-level timeout is only the
+    _POOL_READ_TIMEOUT backstop, never a caller's deadline - the pool
+    outlives whichever caller happened to create it.
+    """
+    global _pooled_client
+    if _pooled_client is None or _pooled_client.is_closed:
+        limits = httpx.Limits(
+            max_keepalive_connections=0 if _NO_KEEPALIVE else 32,
+            max_connections=64,
+            keepalive_expiry=30.0
+        )
+        _pooled_client = httpx.AsyncClient(
+            # Shorter connect timeout; pool=5.0 surfaces pool exhaustion as a
+            # quick PoolTimeout instead of an indefinite hang
+            timeout=httpx.Timeout(_POOL_READ_TIMEOUT, connect=5.0, write=10.0, pool=5.0),
+            limits=limits,
+            http2=False,  # Disable HTTP/2 to avoid protocol issues
+            trust_env=False,  # Ignore env proxies/netrc to avoid surprises
+            follow_redirects=False  # Don't follow redirects
+        )
+        logger.info(f"[DEBUG] Created pooled httpx client (timeout={_POOL_READ_TIMEOUT}s, keepalive=32)")
+
+    return _pooled_client
+
+
+async def close_httpx_client() -> None:
+    """Close the shared httpx client (hooked into server shutdown)."""
+    global _pooled_client
+    if _pooled_client is not None and not _pooled_client.is_closed:
+        await _pooled_client.aclose()
+    _pooled_client = None
 
-def _get_httpx_client(timeout: float = 120.0) -> "httpx.AsyncClient":
+
+# Strong refs to deferred-close tasks so they aren't GC'd mid-flight
+_retired_client_tasks: set = set()
+
+def _retire_httpx_client(client, grace: float = 130.0) -> None:
     """
-    Create a FRESH httpx client for each call.
+    Replace the shared pool, closing the retired client in the background.
 
-    CRITICAL: Do NOT reuse clients! Stale connections cause hanging.
-    Each evaluation attempt gets a fresh client to avoid connection state issues.
+    Closing the pool in place would abort sibling attempts' in-flight
+    requests with RuntimeError when max_concurrency > 1. Swapping the global
+    makes new requests dial fresh sockets immediately; the old client stays
+    usable until the grace period (longer than any per-call deadline) has
+    let in-flight requests drain, and only then is closed.
     """
-    # ALWAYS create a fresh client - no global caching!
-    # Reusing clients leads to stale/CLOSED connections that hang indefinitely
-    limits = httpx.Limits(
-        max_keepalive_connections=0,   # DISABLE keepalive completely - no connection reuse
-        max_connections=5,              # Lower limit to prevent socket exhaustion
-        keepalive_expiry=1.0            # Very short expiry
-    )
-    client = httpx.AsyncClient(
-        timeout=httpx.Timeout(timeout, connect=5.0),  # Shorter connect timeout
-        limits=limits,
-        http2=False,  # Disable HTTP/2 to avoid protocol issues
-        trust_env=False,  # Ignore env proxies/netrc to avoid surprises
-        follow_redirects=False  # Don't follow redirects
-    )
-    logger.info(f"[DEBUG] Created FRESH httpx client (timeout={timeout}s, keepalive=DISABLED)")
+    global _pooled_client
+    if _pooled_client is client:
+        _pooled_client = None
+
+    async def _close_later():
+        await asyncio.sleep(grace)
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+    task = asyncio.create_task(_close_later())
+    _retired_client_tasks.add(task)
+    task.add_done_callback(_retired_client_tasks.discard)
+
 
-    return client
+async def _get_agent_card(white_agent_url: str, httpx_client) -> AgentCard:
+    """Resolve the white agent's card, cached per URL for _CARD_TTL seconds."""
+    entry = _card_cache.get(white_agent_url)
+    if entry is not None and time.monotonic() - entry[0] < _CARD_TTL:
+        return entry[1]
+
+    lock = _card_locks.setdefault(white_agent_url, asyncio.Lock())
+    async with lock:
+        # Re-check: another waiter may have fetched while we queued
+        entry = _card_cache.get(white_agent_url)
+        if entry is not None and time.monotonic() - entry[0] < _CARD_TTL:
+            return entry[1]
+
+        resolver = A2ACardResolver(httpx_client=httpx_client, base_url=white_agent_url)
+        try:
+            card = await asyncio.wait_for(
+                resolver.get_agent_card(relative_card_path="/.well-known/agent-card.json"),
+                timeout=5.0
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError("Agent card fetch timeout after 5s")
+
+        _card_cache[white_agent_url] = (time.monotonic(), card)
+        return card
+
+
+def _invalidate_agent_card(white_agent_url: Optional[str] = None) -> None:
+    """Drop cached agent cards - one URL, or all of them when None."""
+    if white_agent_url is None:
+        _card_cache.clear()
+    else:
+        _card_cache.pop(white_agent_url, None)
 
 
 # ============================================================================
@@ -90,70 +211,100 @@ async def send_message_to_white_agent(
         Dict containing response, context_id, and metadata
     """
     try:
-        from a2a.client import A2AClient, A2ACardResolver
-        from a2a.types import (
-            Message, Part, TextPart, Role,
-            SendMessageRequest, MessageSendParams
-        )
-        from uuid import uuid4
-        import asyncio
+        # Shared pooled client - connection survives across steps/attempts
+        httpx_client = _get_httpx_client()
 
-        # Use FRESH httpx client for each call to avoid stale connections
-        httpx_client = _get_httpx_client(timeout)
+        card = await _get_agent_card(white_agent_url, httpx_client)
 
-        try:
-            # Use cached agent card if available for same URL
-            global _cached_agent_card, _card_cache_url
-            if _cached_agent_card and _card_cache_url == white_agent_url:
-                card = _cached_agent_card
-            else:
-                resolver = A2ACardResolver(httpx_client=httpx_client, base_url=white_agent_url)
-                try:
-                    card = await asyncio.wait_for(
-                        resolver.get_agent_card(relative_card_path="/.well-known/agent-card.json"),
-                        timeout=5.0
-                    )
-                    _cached_agent_card = card
-                    _card_cache_url = white_agent_url
-                except asyncio.TimeoutError:
-                    raise TimeoutError("Agent card fetch timeout after 5s")
-
-            if card is None:
-                raise RuntimeError(f"Failed to resolve agent card from {white_agent_url}")
-
-            client = A2AClient(httpx_client=httpx_client, agent_card=card)
-
-            # Send message
-            params = MessageSendParams(
-                message=Message(
-                    role=Role.user,
-                    parts=[Part(TextPart(text=message))],
-                    message_id=uuid4().hex,
-                    task_id=None,
-                    context_id=context_id,
-                )
+        if card is None:
+            raise RuntimeError(f"Failed to resolve agent card from {white_agent_url}")
+
+        client = A2AClient(httpx_client=httpx_client, agent_card=card)
+
+        # Send message
+        params = MessageSendParams(
+            message=Message(
+                role=Role.user,
+                parts=[Part(TextPart(text=message))],
+                message_id=secrets.token_hex(16),
+                task_id=None,
+                context_id=context_id,
             )
+        )
 
-            request_id = uuid4().hex
-            req = SendMessageRequest(id=request_id, params=params)
+        request_id = secrets.token_hex(16)
+        req = SendMessageRequest(id=request_id, params=params)
 
-            logger.info(f"[A2A] >>> Sending to white agent (len={len(message)}, ctx={context_id})")
+        logger.info(f"[A2A] >>> Sending to white agent (len={len(message)}, ctx={context_id})")
 
+        # Transient failures (timeouts, dropped connections, 429/5xx) get
+        # retried with exponential backoff + jitter instead of failing the
+        # whole attempt; auth errors are not retriable. The retry loop sits
+        # inside the function so the resolved agent card is reused.
+        last_exc = None
+        for send_attempt in range(_SEND_MAX_RETRIES + 1):
             try:
                 response = await asyncio.wait_for(client.send_message(request=req), timeout=timeout)
                 logger.info("[A2A] <<< Received response")
+                break
             except asyncio.TimeoutError:
-                raise TimeoutError(f"Message send timeout after {timeout}s")
+                last_exc = TimeoutError(f"Message send timeout after {timeout}s")
+            except (httpx.ConnectError, httpx.RemoteProtocolError,
+                    httpx.ReadError, httpx.WriteError) as e:
+                last_exc = e
+                # A transport error can leave the connection half-closed in
+                # the pool (CLOSE_WAIT); retire the pool so the retry dials a
+                # fresh socket instead of drawing the same dead one. Retire,
+                # don't close: concurrent attempts may have requests in
+                # flight on the old client.
+                _retire_httpx_client(httpx_client)
+                httpx_client = _get_httpx_client()
+                client = A2AClient(httpx_client=httpx_client, agent_card=card)
+            except Exception as e:
+                msg = str(e)
+                if "429" in msg or "502" in msg or "503" in msg:
+                    last_exc = e
+                else:
+                    raise
+            if send_attempt == _SEND_MAX_RETRIES:
+                raise last_exc
+            delay = min(30.0, 2.0 ** send_attempt) * (1.0 + random.uniform(0.0, 0.5))
+            logger.warning(
+                f"[A2A] Send failed ({last_exc}); retry {send_attempt + 1}/{_SEND_MAX_RETRIES} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
 
-            return {
-                "success": True,
-                "response": response,
-                "context_id": context_id,
-                "message_id": request_id
-            }
+        return {
+            "success": True,
+            "response": response,
+            "context_id": context_id,
+            "message_id": request_id
+        }
 
-        finally:
-            await httpx_client.aclose()
+    # Structured classification first - exception type / HTTP status beats
+    # substring scans over the stringified error. The string fallback only
+    # runs for exceptions that carry no structure.
+    except httpx.HTTPStatusError as e:
+        status = e.response.status_code
+        if status == 429:
+            logger.error(f"Rate limit error: {e}")
+        elif status in (401, 403):
+            logger.error(f"Auth error: {e}")
+        else:
+            logger.error(f"HTTP {status} error: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__
+        }
+
+    except (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException) as e:
+        logger.error(f"Timeout error: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__
+        }
 
     except Exception as e:
         error_msg = str(e)
@@ -161,8 +312,6 @@ async def send_message_to_white_agent(
 
         if "429" in error_msg or "rate" in error_msg.lower():
             logger.error(f"Rate limit error: {error_msg}")
-        elif "timeout" in error_type.lower():
-            logger.error(f"Timeout error: {error_msg}")
         elif "401" in error_msg or "unauthorized" in error_msg.lower():
             logger.error(f"Auth error: {error_msg}")
         else:
@@ -188,58 +337,67 @@ async def reset_white_agent(white_agent_url: str, timeout: float = 30.0) -> Dict
     Returns:
         Dict with success status and message
     """
-    global _cached_agent_card, _card_cache_url
-
     try:
-        import re
-        import asyncio
-
         logger.info(f"[RESET] Resetting white agent at {white_agent_url}")
 
         # Extract host and port from URL
-        match = re.match(r'https?://([^:]+):(\d+)', white_agent_url)
+        match = _AGENT_URL_RE.match(white_agent_url)
         if not match:
             return {"success": False, "error": "Invalid URL format"}
 
         host, port = match.groups()
         launcher_url = f"http://{host}:9210"
 
-        httpx_client = _get_httpx_client(timeout)
+        httpx_client = _get_httpx_client()
         try:
             # Terminate the white agent
             await httpx_client.post(f"{launcher_url}/terminate", timeout=timeout)
             await asyncio.sleep(1.0)
 
+            # The restart invalidates every pooled connection to the white
+            # agent; retire the pool so the next send dials a fresh socket.
+            # Retire, don't close: with max_concurrent_tasks > 1 sibling
+            # tasks may have requests in flight on this pool, and those go
+            # to the launcher/backend, which the restart doesn't touch.
+            _retire_httpx_client(httpx_client)
+            httpx_client = _get_httpx_client()
+
             # Relaunch the white agent
             launch_response = await httpx_client.post(f"{launcher_url}/launch", timeout=timeout)
 
             if launch_response.status_code == 200:
-                # Wait for agent to be ready
-                start = asyncio.get_event_loop().time()
+                # Wait for agent to be ready. Exponential backoff with jitter:
+                # tight early probes catch a fast startup, later probes back
+                # off toward 1s so a slow one isn't hammered.
+                loop = asyncio.get_running_loop()
+                start = loop.time()
                 probe_path = "/.well-known/agent-card.json"
-                while (asyncio.get_event_loop().time() - start) < timeout:
+                delay = 0.05
+                while (loop.time() - start) < timeout:
                     try:
                         resp = await httpx_client.get(f"{white_agent_url}{probe_path}", timeout=5.0)
                         if resp.status_code == 200:
                             break
                     except Exception:
                         pass
-                    await asyncio.sleep(0.5)
+                    # Don't sleep past the deadline: a wait that can't be
+                    # followed by another probe is pure added latency
+                    sleep_for = min(delay * (1.0 + random.random() * 0.5), 1.0)
+                    if (loop.time() - start) + sleep_for >= timeout:
+                        break
+                    await asyncio.sleep(sleep_for)
+                    delay = min(delay * 2.0, 1.0)
 
                 # Clear agent card cache
-                _cached_agent_card = None
-                _card_cache_url = None
+                _invalidate_agent_card(white_agent_url)
 
                 return {"success": True, "message": "White agent restarted"}
             else:
                 return {"success": False, "error": f"Launch returned {launch_response.status_code}"}
 
         except Exception as e:
-            _cached_agent_card = None
-            _card_cache_url = None
+            _invalidate_agent_card(white_agent_url)
             return {"success": False, "error": str(e)}
-        finally:
-            await httpx_client.aclose()
 
     except Exception as e:
         logger.error(f"[RESET] Reset failed: {e}")
@@ -301,7 +459,7 @@ async def log_battle_progress(
 
     except Exception as e:
         logger.error(f"Error logging battle progress: {e}")
-        return f"Error logging: {str(e)}"
+        return f"Error logging: {e}"
 
 
 @ab.tool
@@ -351,13 +509,72 @@ async def report_battle_result(
 
     except Exception as e:
         logger.error(f"Error reporting battle result: {e}")
-        return f"Error reporting: {str(e)}"
+        return f"Error reporting: {e}"
 
 
 # ============================================================================
 # TAU-BENCH ENVIRONMENT TOOLS
 # ============================================================================
 
+@functools.lru_cache(maxsize=4)
+def _get_cached_env(domain: str):
+    """
+    Construct a tau-bench env once per domain and reuse it.
+
+    Construction re-parses the task dataset and tool schemas, which is
+    deterministic per domain; callers pick the concrete task via
+    env.reset(task_index=...). The cached instance must not be shared
+    across concurrently running attempts - those construct private envs.
+    """
+    return get_env(
+        env_name=domain,
+        user_strategy="llm",
+        user_model=TAU_USER_MODEL,
+        task_split="test",
+        user_provider=TAU_USER_PROVIDER,
+        task_index=0,
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _tools_info_json(domain: str) -> str:
+    """Pretty-printed tools_info for a domain, serialized once per process."""
+    return orjson.dumps(
+        _get_cached_env(domain).tools_info, option=orjson.OPT_INDENT_2
+    ).decode()
+
+
+# Domains whose cached env is currently inside an evaluation. Concurrent
+# battles on the same domain must not share the stateful cached instance.
+_leased_env_domains: set = set()
+
+
+def _lease_cached_env(domain: str, task_index: int):
+    """
+    Lease the per-domain cached env, or build a private one if it's taken.
+
+    The check-and-set has no await point, so it is atomic on the event loop:
+    the first evaluation gets the cached instance, any overlapping one for
+    the same domain pays for a private env instead of interleaving
+    reset/step with the lease holder.
+
+    Returns (env, release); the caller must call release() once done.
+    """
+    if domain not in _leased_env_domains:
+        _leased_env_domains.add(domain)
+        return _get_cached_env(domain), functools.partial(_leased_env_domains.discard, domain)
+    logger.info(f"[ENV] Cached {domain} env already in use; building a private instance")
+    env = get_env(
+        env_name=domain,
+        user_strategy="llm",
+        user_model=TAU_USER_MODEL,
+        task_split="test",
+        user_provider=TAU_USER_PROVIDER,
+        task_index=task_index,
+    )
+    return env, lambda: None
+
+
 @ab.tool
 async def setup_tau_bench_environment(
     env_name: str = "retail",
@@ -430,16 +647,9 @@ def get_tau_bench_tools_as_json(task_id: int = 5) -> str:
         JSON string containing all tool schemas
     """
     try:
-        env = get_env(
-            env_name="retail",
-            user_strategy="llm",
-            user_model=TAU_USER_MODEL,
-            task_split="test",
-            user_provider=TAU_USER_PROVIDER,
-            task_index=task_id,
-        )
-
-        return json.dumps(env.tools_info, indent=2)
+        # tools_info doesn't depend on the task, so the cached env and its
+        # cached serialization suffice
+        return _tools_info_json("retail")
 
     except Exception as e:
         logger.error(f"Error getting tau-bench tools: {e}")
@@ -458,14 +668,8 @@ def list_tau_bench_tools(task_id: int = 5) -> str:
         Formatted string listing all tools with descriptions
     """
     try:
-        env = get_env(
-            env_name="retail",
-            user_strategy="llm",
-            user_model=TAU_USER_MODEL,
-            task_split="test",
-            user_provider=TAU_USER_PROVIDER,
-            task_index=task_id,
-        )
+        # tools_info doesn't depend on the task, so the cached env suffices
+        env = _get_cached_env("retail")
 
         tool_list = []
         for tool in env.tools_info:
@@ -483,13 +687,43 @@ def list_tau_bench_tools(task_id: int = 5) -> str:
 
     except Exception as e:
         logger.error(f"Error listing tau-bench tools: {e}")
-        return f"Error: {str(e)}"
+        return f"Error: {e}"
 
 
 # ============================================================================
 # EVALUATION ORCHESTRATION TOOLS
 # ============================================================================
 
+def _has_success_run(flags, run_len: int) -> bool:
+    """True if `flags` contains `run_len` consecutive True values.
+
+    Single O(n) run-length scan, versus slicing every window (O(n*run_len)).
+    """
+    run = 0
+    for flag in flags:
+        run = run + 1 if flag else 0
+        if run >= run_len:
+            return True
+    return False
+
+
+def _fail_result(info: Dict[str, Any], error: str, steps_completed: int,
+                 total_cost: float) -> Dict[str, Any]:
+    """Shared failure shape for evaluate_white_agent.
+
+    Mutates `info` in place - every caller returns immediately, so the
+    {**info, ...} copy the inline literals paid for is unnecessary.
+    """
+    info["error"] = error
+    info["steps_completed"] = steps_completed
+    return {
+        "success": False,
+        "reward": 0.0,
+        "info": info,
+        "total_cost": total_cost
+    }
+
+
 @ab.tool
 async def evaluate_white_agent(
     white_agent_url: str,
@@ -509,10 +743,6 @@ async def evaluate_white_agent(
     Returns:
         Dict containing evaluation results, metrics, and info
     """
-    from a2a.types import SendMessageSuccessResponse, Message
-    from a2a.utils import get_text_parts
-    from src.my_util import parse_tags
-
     logger.info(f"Starting evaluation of {white_agent_url} on task {task_id}")
 
     # Set up environment
@@ -526,27 +756,39 @@ async def evaluate_white_agent(
             "task_ids": [task_id],
         }
 
-    env = get_env(
-        env_name=env_config["env"],
-        user_strategy=env_config["user_strategy"],
-        user_model=env_config["user_model"],
-        task_split=env_config["task_split"],
-        user_provider=env_config.get("user_provider", TAU_USER_PROVIDER),
-        task_index=task_id,
-    )
+    if (
+        env_config.get("user_strategy") == "llm"
+        and env_config.get("user_model") == TAU_USER_MODEL
+        and env_config.get("user_provider", TAU_USER_PROVIDER) == TAU_USER_PROVIDER
+        and env_config.get("task_split") == "test"
+    ):
+        # Stock config: reuse the per-domain cached env rather than re-loading
+        # the task database; the reset() below selects the concrete task
+        env, _release_env = _lease_cached_env(env_config["env"], task_id)
+    else:
+        env = get_env(
+            env_name=env_config["env"],
+            user_strategy=env_config["user_strategy"],
+            user_model=env_config["user_model"],
+            task_split=env_config["task_split"],
+            user_provider=env_config.get("user_provider", TAU_USER_PROVIDER),
+            task_index=task_id,
+        )
+        _release_env = lambda: None
 
-    # Reset environment
-    total_cost = 0.0
-    env_reset_res = env.reset(task_index=task_id)
-    obs = env_reset_res.observation
-    info = env_reset_res.info.model_dump()
-    reward = 0.0
+    try:
+        # Reset environment
+        total_cost = 0.0
+        env_reset_res = env.reset(task_index=task_id)
+        obs = env_reset_res.observation
+        info = env_reset_res.info.model_dump()
+        reward = 0.0
 
-    # Create initial task description
-    task_description = f"""
+        # Create initial task description
+        task_description = f"""
 {env.wiki}
 Here's a list of tools you can use (you can use at most one tool at a time):
-{json.dumps(env.tools_info, indent=2)}
+{orjson.dumps(env.tools_info, option=orjson.OPT_INDENT_2).decode()}
 Please response in the JSON format. Please wrap the JSON part with <json>...</json> tags.
 The JSON should contain:
 - "name": the tool call function name, or "{RESPOND_ACTION_NAME}" if you want to respond directly.
@@ -556,143 +798,148 @@ Next, I'll provide you with the user message and tool call results.
 User message: {obs}
     """
 
-    next_green_message = task_description
-    context_id = None
-
-    # Evaluation loop
-    for step_num in range(max_num_steps):
-        logger.info(f"Step {step_num + 1}/{max_num_steps}")
+        next_green_message = task_description
+        context_id = None
+
+        # Progress logging is fire-and-forget: the backend round-trip overlaps
+        # the white-agent call instead of serializing into each step. The set
+        # keeps strong references until each task finishes (done callbacks
+        # discard them), so early error returns can't orphan a pending task.
+        progress_tasks = set()
+
+        # Evaluation loop
+        for step_num in range(max_num_steps):
+            logger.info(f"Step {step_num + 1}/{max_num_steps}")
+
+            # Log progress
+            progress_task = asyncio.create_task(log_battle_progress(
+                f"Evaluation step {step_num + 1}/{max_num_steps}...",
+                step=step_num + 1,
+                total_steps=max_num_steps
+            ))
+            progress_tasks.add(progress_task)
+            progress_task.add_done_callback(progress_tasks.discard)
+
+            # Send message to white agent
+            result = await send_message_to_white_agent(
+                white_agent_url,
+                next_green_message,
+                context_id=context_id,
+                timeout=120.0
+            )
 
-        # Log progress
-        await log_battle_progress(
-            f"Evaluation step {step_num + 1}/{max_num_steps}...",
-            step=step_num + 1,
-            total_steps=max_num_steps
-        )
+            if not result["success"]:
+                error_msg = result.get("error", "Unknown error")
+                logger.error(f"White agent error: {error_msg}")
+                return _fail_result(info, error_msg, step_num + 1, total_cost)
 
-        # Send message to white agent
-        result = await send_message_to_white_agent(
-            white_agent_url,
-            next_green_message,
-            context_id=context_id,
-            timeout=120.0
-        )
+            white_agent_response = result["response"]
+            res_root = white_agent_response.root
 
-        if not result["success"]:
-            error_msg = result.get("error", "Unknown error")
-            logger.error(f"White agent error: {error_msg}")
-            return {
-                "success": False,
-                "reward": 0.0,
-                "info": {**info, "error": error_msg, "steps_completed": step_num + 1},
-                "total_cost": total_cost
-            }
+            if not isinstance(res_root, SendMessageSuccessResponse):
+                logger.error(f"Invalid response type: {type(res_root)}")
+                return _fail_result(info, "Invalid response format", step_num + 1, total_cost)
 
-        white_agent_response = result["response"]
-        res_root = white_agent_response.root
+            res_result = res_root.result
+            if not isinstance(res_result, Message):
+                logger.error(f"Unexpected result type: {type(res_result)}")
+                return _fail_result(info, "Unexpected response format", step_num + 1, total_cost)
 
-        if not isinstance(res_root, SendMessageSuccessResponse):
-            logger.error(f"Invalid response type: {type(res_root)}")
-            return {
-                "success": False,
-                "reward": 0.0,
-                "info": {**info, "error": "Invalid response format", "steps_completed": step_num + 1},
-                "total_cost": total_cost
-            }
+            # Update context ID
+            if context_id is None:
+                context_id = res_result.context_id
 
-        res_result = res_root.result
-        if not isinstance(res_result, Message):
-            logger.error(f"Unexpected result type: {type(res_result)}")
-            return {
-                "success": False,
-                "reward": 0.0,
-                "info": {**info, "error": "Unexpected response format", "steps_completed": step_num + 1},
-                "total_cost": total_cost
-            }
+            # Parse response
+            text_parts = get_text_parts(res_result.parts)
+            if len(text_parts) != 1:
+                return _fail_result(info, "Expected exactly one text part", step_num + 1, total_cost)
 
-        # Update context ID
-        if context_id is None:
-            context_id = res_result.context_id
-
-        # Parse response
-        text_parts = get_text_parts(res_result.parts)
-        if len(text_parts) != 1:
-            return {
-                "success": False,
-                "reward": 0.0,
-                "info": {**info, "error": "Expected exactly one text part", "steps_completed": step_num + 1},
-                "total_cost": total_cost
-            }
+            white_text = text_parts[0]
+            logger.info(f"White agent response: {white_text[:200]}...")
 
-        white_text = text_parts[0]
-        logger.info(f"White agent response: {white_text[:200]}...")
-
-        # Parse action from response
-        white_tags = parse_tags(white_text)
-        if "json" not in white_tags:
-            return {
-                "success": False,
-                "reward": 0.0,
-                "info": {**info, "error": "Missing <json> tags in response", "steps_completed": step_num + 1},
-                "total_cost": total_cost
-            }
+            # Parse action from response: only the <json> tag matters here, so a
+            # linear str.find scan beats the backtracking all-tags regex
+            action_json = _extract_json_tag(white_text)
+            if action_json is None:
+                return _fail_result(info, "Missing <json> tags in response", step_num + 1, total_cost)
 
-        action_json = white_tags["json"]
-        try:
-            action_dict = json.loads(action_json)
-            action = Action(**action_dict)
-        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
-            return {
-                "success": False,
-                "reward": 0.0,
-                "info": {**info, "error": f"Invalid JSON: {str(e)}", "steps_completed": step_num + 1},
-                "total_cost": total_cost
-            }
+            try:
+                action_dict = orjson.loads(action_json)
+                action = Action(**action_dict)
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                return _fail_result(info, f"Invalid JSON: {e}", step_num + 1, total_cost)
+
+            # Execute action in environment
+            env_response = env.step(action)
+            reward = env_response.reward
+            # In-place merge: rebuilding the dict each step re-copies every
+            # accumulated key (O(n^2) over the loop)
+            info.update(env_response.info.model_dump())
+
+            # Prepare next message - flat strings, no template whitespace around
+            # the observation (tokens the white agent would just pay for)
+            if action.name != RESPOND_ACTION_NAME:
+                next_green_message = f"Tool call result:\n{env_response.observation}"
+            else:
+                next_green_message = f"User message:\n{env_response.observation}"
 
-        # Execute action in environment
-        env_response = env.step(action)
-        reward = env_response.reward
-        info = {**info, **env_response.info.model_dump()}
-
-        # Prepare next message
-        if action.name != RESPOND_ACTION_NAME:
-            next_green_message = f"""
-Tool call result:
-{env_response.observation}
-            """
-        else:
-            next_green_message = f"""
-User message:
-{env_response.observation}
-            """
+            if env_response.done:
+                break
 
-        if env_response.done:
-            break
+        # Let any still-inflight progress logs finish before reporting
+        if progress_tasks:
+            await asyncio.gather(*progress_tasks, return_exceptions=True)
 
-    # Return final result
-    return {
-        "success": reward == 1.0,
-        "reward": reward,
-        "info": info,
-        "total_cost": total_cost,
-        "steps_completed": step_num + 1
-    }
+        # Return final result
+        return {
+            "success": reward == 1.0,
+            "reward": reward,
+            "info": info,
+            "total_cost": total_cost,
+            "steps_completed": step_num + 1
+        }
+    finally:
+        _release_env()
 
 
 # ============================================================================
 # UTILITY TOOLS
 # ============================================================================
 
+def _extract_json_tag(text: str) -> Optional[str]:
+    """Extract the content of the first <json>...</json> block, or None.
+
+    str.find runs at C speed and can't backtrack, unlike the generic
+    all-tags regex, which matters on large white-agent responses.
+    """
+    i = text.find("<json>")
+    if i < 0:
+        return None
+    j = text.find("</json>", i + 6)
+    if j < 0:
+        return None
+    return text[i + 6:j].strip()
+
+
+# Matches every <tag>...</tag> pair; compiled once so _parse_tags_helper
+# skips the re-cache hash lookup on each white-agent response.
+_ALL_TAGS_RE = re.compile(r"<(.*?)>(.*?)</\1>", re.DOTALL)
+
+
 def _parse_tags_helper(str_with_tags: str) -> dict:
     """
     Internal helper to parse XML-style tags from text.
     Tags are in the format <tag_name>...</tag_name>
-    
+
     Returns dict with tag names as keys and content as values.
     """
-    import re
-    tags = re.findall(r"<(.*?)>(.*?)</\1>", str_with_tags, re.DOTALL)
-    return {tag: content.strip() for tag, content in tags}
+    return {tag: content.strip() for tag, content in _ALL_TAGS_RE.findall(str_with_tags)}
+
+
+@functools.lru_cache(maxsize=32)
+def _tag_pattern(tag: str) -> "re.Pattern":
+    """Compiled extractor for a single <tag>...</tag> pair, cached per tag."""
+    return re.compile(rf"<{re.escape(tag)}>(.*?)</{re.escape(tag)}>", re.DOTALL)
 
 
 @ab.tool
@@ -708,8 +955,16 @@ def parse_xml_tags(text: str, tag: str) -> str:
         Content within the specified tags, or empty string if not found
     """
     try:
-        tags = _parse_tags_helper(text)
-        return tags.get(tag, "")
+        # Fast path: plain substring scan (C-level str.find) covers the
+        # well-formed case; the compiled per-tag regex is the fallback.
+        open_tag = f"<{tag}>"
+        i = text.find(open_tag)
+        if i != -1:
+            j = text.find(f"</{tag}>", i + len(open_tag))
+            if j != -1:
+                return text[i + len(open_tag):j].strip()
+        match = _tag_pattern(tag).search(text)
+        return match.group(1).strip() if match else ""
     except Exception as e:
         logger.error(f"Error parsing tags: {e}")
         return ""
@@ -781,6 +1036,9 @@ async def evaluate_agent_with_pass_k(
     k: int = 4,
     max_num_steps: int = 30,
     reset_between_attempts: bool = True,
+    max_concurrency: int = 1,
+    use_cached_env: bool = True,
+    early_exit: bool = False,
     battle_id: Optional[str] = None,
     backend_url: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -798,18 +1056,18 @@ async def evaluate_agent_with_pass_k(
         task_id: Task ID within the domain
         k: Number of attempts (must be even)
         max_num_steps: Maximum steps per attempt
+        max_concurrency: Run up to this many attempts concurrently (1 = sequential)
+        use_cached_env: Reuse the per-domain cached env (disable when several
+            evaluations for the same domain may run concurrently)
+        early_exit: Stop launching attempts once pass^k and pass^(k/2) are
+            both decided (sequential mode only); success_rate is then
+            computed over the attempts actually executed
         battle_id: Optional battle ID for AgentBeats logging
         backend_url: Optional backend URL for AgentBeats logging
 
     Returns:
         Dict with pass^k metrics, attempt details, and failure analysis
     """
-    import time
-    import asyncio
-    from uuid import uuid4
-    from a2a.types import SendMessageSuccessResponse, Message
-    from a2a.utils import get_text_parts
-
     logger.info(f"=== Starting pass@k evaluation: domain={domain}, task={task_id}, k={k} ===")
 
     # Set up battle context for logging
@@ -827,185 +1085,204 @@ async def evaluate_agent_with_pass_k(
             {"domain": domain, "task_id": task_id, "k": k}
         )
 
-    # Set up tau-bench environment
-    env = get_env(
-        env_name=domain,
-        user_strategy="llm",
-        user_model=TAU_USER_MODEL,
-        task_split="test",
-        user_provider=TAU_USER_PROVIDER,
-        task_index=task_id
-    )
-
-    # Run k attempts
-    attempts = []
-    failure_reasons = []
-    total_steps = 0
-
-    for attempt_num in range(k):
-        logger.info(f"--- Attempt {attempt_num + 1}/{k} ---")
-        logger.info(f"[DEBUG] ========== ATTEMPT {attempt_num + 1}/{k} STARTING ==========")
-
-        # Optionally reset white agent to prevent state pollution (safer to rely on new context_id)
-        if reset_between_attempts:
-            try:
-                logger.info(f"[RESET] Resetting white agent before attempt {attempt_num + 1}")
-                print(f"[RESET] Resetting white agent before attempt {attempt_num + 1}", file=sys.stderr, flush=True)
-                reset_result = await reset_white_agent(white_agent_url, timeout=30.0)
-                if reset_result["success"]:
-                    logger.info("[RESET] White agent reset completed successfully")
-                    print("[RESET] White agent reset completed successfully", file=sys.stderr, flush=True)
-                else:
-                    logger.warning(f"[RESET] Reset returned failure but continuing: {reset_result.get('error')}")
-                    print(f"[RESET] Reset failed but continuing: {reset_result.get('error')}", file=sys.stderr, flush=True)
-            except Exception as e:
-                logger.warning(f"[RESET] Warning: Reset failed (continuing anyway): {e}")
-                print(f"[RESET] Warning: Reset exception (continuing anyway): {e}", file=sys.stderr, flush=True)
-
-        if battle_context:
-            ab.record_battle_event(
-                battle_context,
-                f"🔄 Starting attempt {attempt_num + 1}/{k}...",
-                {}
-            )
-
-        timestamp_started = time.time()
-
-        # Reset environment for fresh attempt
-        logger.info(f"[DEBUG] Calling env.reset() for attempt {attempt_num + 1}")
-        env_reset_res = env.reset(task_index=task_id)
-        logger.info(f"[DEBUG] env.reset() completed for attempt {attempt_num + 1}")
-        obs = env_reset_res.observation
-        info = env_reset_res.info.model_dump()
-        reward = 0.0
+    # Set up tau-bench environment. Sequential attempts reuse the cached env
+    # and select the task through env.reset() below, so k attempts pay env
+    # construction (dataset + tool-schema parsing) at most once per domain.
+    # The lease makes an overlapping evaluation for the same domain fall back
+    # to a private instance since envs are stateful.
+    if use_cached_env:
+        env, release_env = _lease_cached_env(domain, task_id)
+    else:
+        env = get_env(
+            env_name=domain,
+            user_strategy="llm",
+            user_model=TAU_USER_MODEL,
+            task_split="test",
+            user_provider=TAU_USER_PROVIDER,
+            task_index=task_id,
+        )
+        release_env = lambda: None
 
-        # Create task description
-        task_description = f"""
+    # The wiki/tools prefix of the task description is invariant across the k
+    # attempts (tools_info and wiki are per-domain data), so serialize it once
+    # here instead of re-dumping tools_info inside every attempt. Byte-stable
+    # across attempts, which is also what provider prefix caching keys on.
+    task_prefix = f"""
 {env.wiki}
 Here's a list of tools you can use (you can use at most one tool at a time):
-{json.dumps(env.tools_info, indent=2)}
+{orjson.dumps(env.tools_info, option=orjson.OPT_INDENT_2).decode()}
 Please response in the JSON format. Please wrap the JSON part with <json>...</json> tags.
 The JSON should contain:
 - "name": the tool call function name, or "{RESPOND_ACTION_NAME}" if you want to respond directly.
 - "kwargs": the arguments for the tool call, or {{"content": "your message here"}} if you want to respond directly.
 
 Next, I'll provide you with the user message and tool call results.
-User message: {obs}
-        """
-
-        next_green_message = task_description
-        # Create a NEW context for each attempt to ensure white agent starts fresh
-        # This prevents conversation history from leaking between attempts
-        context_id = f"attempt_{attempt_num + 1}_{uuid4().hex[:8]}"
-        steps_in_attempt = 0
-        attempt_error = None
-
-        # Evaluation loop for this attempt
-        for _ in range(max_num_steps):
-            steps_in_attempt += 1
-            total_steps += 1
-
-            try:
-                # Send message to white agent
-                result = await send_message_to_white_agent(
-                    white_agent_url,
-                    next_green_message,
-                    context_id=context_id,
-                    timeout=120.0
-                )
-
-                if not result["success"]:
-                    attempt_error = result.get("error", "Unknown error")
-                    logger.error(f"White agent error: {attempt_error}")
-                    break
-
-                # Extract response
-                white_agent_response = result["response"]
-                res_root = white_agent_response.root
-
-                if not isinstance(res_root, SendMessageSuccessResponse):
-                    attempt_error = f"White agent returned error: {res_root}"
-                    logger.error(attempt_error)
-                    break
+"""
 
-                res_result = res_root.result
-                if not isinstance(res_result, Message):
-                    attempt_error = f"Unexpected response type: {type(res_result)}"
-                    logger.error(attempt_error)
-                    break
+    # Run k attempts. Each attempt is self-contained so it can run either
+    # sequentially (the default) or concurrently under a bounded semaphore.
+    async def _run_attempt(attempt_num: int, env) -> Dict[str, Any]:
+        """Run one evaluation attempt against the white agent and return its record."""
+        logger.info(f"--- Attempt {attempt_num + 1}/{k} ---")
+        logger.info(f"[DEBUG] ========== ATTEMPT {attempt_num + 1}/{k} STARTING ==========")
 
-                # Parse white agent response
-                text_parts = get_text_parts(res_result.parts)
-                if len(text_parts) != 1:
-                    attempt_error = "Expected exactly one text part from white agent"
-                    logger.error(attempt_error)
-                    break
+        if battle_context:
+            ab.record_battle_event(
+                battle_context,
+                f"🔄 Starting attempt {attempt_num + 1}/{k}...",
+                {}
+            )
 
-                white_text = text_parts[0]
+        # perf_counter: monotonic and high-resolution, immune to NTP jumps
+        timestamp_started = time.perf_counter()
 
-                # Parse action from response
-                white_tags = parse_xml_tags(white_text, "json")
-                if not white_tags:
-                    attempt_error = "Missing <json> tags in response"
-                    logger.error(attempt_error)
-                    break
+        # One pinned worker thread per attempt for the sync tau-bench calls:
+        # env.step is serial per env anyway, and reusing a dedicated thread
+        # skips the default executor's per-call submission overhead while
+        # keeping other coroutines off its queue.
+        loop = asyncio.get_running_loop()
+        env_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"tau_env_{domain}_{task_id}"
+        )
 
-                try:
-                    action_dict = json.loads(white_tags)
-                    action = Action(**action_dict)
-                except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
-                    attempt_error = f"Invalid JSON: {str(e)}"
-                    logger.error(attempt_error)
-                    break
+        try:
+            # Reset environment for fresh attempt (off-loop: reset is sync and can
+            # hit the user-sim LLM, same as env.step below)
+            logger.info(f"[DEBUG] Calling env.reset() for attempt {attempt_num + 1}")
+            env_reset_res = await loop.run_in_executor(
+                env_executor, functools.partial(env.reset, task_index=task_id)
+            )
+            logger.info(f"[DEBUG] env.reset() completed for attempt {attempt_num + 1}")
+            obs = env_reset_res.observation
+            info = env_reset_res.info.model_dump()
+            reward = 0.0
+
+            # Only the per-attempt observation varies; the heavy prefix is shared
+            next_green_message = f"{task_prefix}User message: {obs}"
+            # Create a NEW context for each attempt to ensure white agent starts fresh
+            # This prevents conversation history from leaking between attempts
+            context_id = f"attempt_{attempt_num + 1}_{secrets.token_hex(4)}"
+            steps_in_attempt = 0
+            attempt_error = None
+
+            # Evaluation loop for this attempt
+            for _ in range(max_num_steps):
+                steps_in_attempt += 1
 
-                # Execute action in tau-bench environment with a safety timeout
                 try:
-                    ENV_STEP_TIMEOUT = 60.0
-                    env_response = await asyncio.wait_for(
-                        asyncio.to_thread(env.step, action),
-                        timeout=ENV_STEP_TIMEOUT
+                    # Send message to white agent
+                    result = await send_message_to_white_agent(
+                        white_agent_url,
+                        next_green_message,
+                        context_id=context_id,
+                        timeout=120.0
                     )
-                except asyncio.TimeoutError:
-                    attempt_error = f"Environment step timed out after {ENV_STEP_TIMEOUT}s for action '{action.name}'"
-                    logger.error(attempt_error)
-                    break
 
-                reward = env_response.reward
-                info = {**info, **env_response.info.model_dump()}
-
-                # Prepare next message
-                if action.name != RESPOND_ACTION_NAME:
-                    observation_text = str(env_response.observation)
-                    MAX_MESSAGE_SIZE = 10000
-                    if len(observation_text) > MAX_MESSAGE_SIZE:
-                        logger.info(f"Truncating tool result from {len(observation_text)} to {MAX_MESSAGE_SIZE} chars")
-                        observation_text = observation_text[:MAX_MESSAGE_SIZE] + "\n...[TRUNCATED]"
-                    next_green_message = f"Tool call result:\n{observation_text}"
-                else:
-                    next_green_message = f"User message:\n{env_response.observation}"
+                    if not result["success"]:
+                        attempt_error = result.get("error", "Unknown error")
+                        logger.error(f"White agent error: {attempt_error}")
+                        break
+
+                    # Extract response
+                    white_agent_response = result["response"]
+                    res_root = white_agent_response.root
+
+                    if not isinstance(res_root, SendMessageSuccessResponse):
+                        attempt_error = f"White agent returned error: {res_root}"
+                        logger.error(attempt_error)
+                        break
+
+                    res_result = res_root.result
+                    if not isinstance(res_result, Message):
+                        attempt_error = f"Unexpected response type: {type(res_result)}"
+                        logger.error(attempt_error)
+                        break
+
+                    # Parse white agent response
+                    text_parts = get_text_parts(res_result.parts)
+                    if len(text_parts) != 1:
+                        attempt_error = "Expected exactly one text part from white agent"
+                        logger.error(attempt_error)
+                        break
+
+                    white_text = text_parts[0]
+
+                    # Parse action from response
+                    white_tags = parse_xml_tags(white_text, "json")
+                    if not white_tags:
+                        attempt_error = "Missing <json> tags in response"
+                        logger.error(attempt_error)
+                        break
+
+                    try:
+                        action_dict = orjson.loads(white_tags)
+                        action = Action(**action_dict)
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                        attempt_error = f"Invalid JSON: {e}"
+                        logger.error(attempt_error)
+                        break
+
+                    # Execute action in tau-bench environment with a safety timeout
+                    try:
+                        ENV_STEP_TIMEOUT = 60.0
+                        env_response = await asyncio.wait_for(
+                            loop.run_in_executor(env_executor, env.step, action),
+                            timeout=ENV_STEP_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        attempt_error = f"Environment step timed out after {ENV_STEP_TIMEOUT}s for action '{action.name}'"
+                        logger.error(attempt_error)
+                        break
+
+                    reward = env_response.reward
+                    # In-place merge: rebuilding the dict each step re-copies
+                    # every accumulated key (O(n^2) over the loop)
+                    info.update(env_response.info.model_dump())
+
+                    # Prepare next message
+                    if action.name != RESPOND_ACTION_NAME:
+                        # Observations are already strings in the common case;
+                        # skip the copy str() would make
+                        obs_val = env_response.observation
+                        observation_text = obs_val if isinstance(obs_val, str) else str(obs_val)
+                        MAX_MESSAGE_SIZE = 10000
+                        if len(observation_text) > MAX_MESSAGE_SIZE:
+                            # Truncate on a byte budget (what payload limits
+                            # actually measure), dropping a split multi-byte
+                            # char at the cut point
+                            logger.info(f"Truncating tool result from {len(observation_text)} chars to {MAX_MESSAGE_SIZE} bytes")
+                            truncated = observation_text.encode()[:MAX_MESSAGE_SIZE]
+                            observation_text = truncated.decode("utf-8", errors="ignore") + "\n...[TRUNCATED]"
+                        next_green_message = f"Tool call result:\n{observation_text}"
+                    else:
+                        next_green_message = f"User message:\n{env_response.observation}"
 
-                if env_response.done:
+                    if env_response.done:
+                        break
+
+                except Exception as e:
+                    attempt_error = f"Exception: {type(e).__name__}: {e}"
+                    logger.error(attempt_error, exc_info=True)
                     break
 
-            except Exception as e:
-                attempt_error = f"Exception: {type(e).__name__}: {str(e)}"
-                logger.error(attempt_error, exc_info=True)
-                break
+        finally:
+            # Worker thread is done once the loop exits; also runs when
+            # env.reset raises, so a failed attempt can't leak the thread
+            # (wait=False: a step that timed out may still be draining)
+            env_executor.shutdown(wait=False)
 
         logger.info(f"Attempt {attempt_num + 1} completed: {steps_in_attempt} steps, reward={reward}")
-        
+
         # Record attempt result
-        time_used = time.time() - timestamp_started
+        time_used = time.perf_counter() - timestamp_started
         success = (reward == 1 and attempt_error is None)
 
         # Extract detailed failure information from tau-bench
         failure_detail = None
         if not success:
             failure_detail = extract_failure_details(info, attempt_error)
-            failure_reason = failure_detail["category"]
-            failure_reasons.append(failure_reason)
 
-        attempts.append({
+        attempt_record = {
             "attempt": attempt_num + 1,
             "success": success,
             "reward": reward,
@@ -1014,19 +1291,12 @@ User message: {obs}
             "error": attempt_error,
             "failure_detail": failure_detail,
             "tau_bench_info": info
-        })
+        }
 
         # Log attempt result
         result_emoji = "✅" if success else "❌"
         logger.info(f"Attempt {attempt_num + 1}/{k}: {result_emoji} (reward={reward}, steps={steps_in_attempt}, time={time_used:.1f}s)")
 
-        # Small delay between attempts to prevent resource exhaustion
-        if attempt_num < k - 1:
-            global _cached_agent_card, _card_cache_url
-            _cached_agent_card = None
-            _card_cache_url = None
-            await asyncio.sleep(2.0)
-
         if battle_context:
             # Build detailed failure message for UI
             event_message = f"{result_emoji} Attempt {attempt_num + 1}/{k}: {'SUCCESS' if success else 'FAILED'}"
@@ -1097,6 +1367,94 @@ User message: {obs}
                 event_detail
             )
 
+        return attempt_record
+
+    k_half = k // 2
+
+    try:
+        if max_concurrency > 1:
+            # Concurrent attempts: tau-bench envs are stateful, so each attempt
+            # gets its own env instance. Isolation between attempts comes from the
+            # per-attempt context IDs, so the white-agent reset and inter-attempt
+            # delay are skipped in this mode.
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def _bounded_attempt(attempt_num: int) -> Dict[str, Any]:
+                async with semaphore:
+                    # Env construction re-parses the task dataset and tool
+                    # schemas; run it off-loop like reset/step so building
+                    # one attempt's env doesn't stall the siblings' A2A
+                    # traffic or the heartbeat
+                    attempt_env = await asyncio.to_thread(
+                        get_env,
+                        env_name=domain,
+                        user_strategy="llm",
+                        user_model=TAU_USER_MODEL,
+                        task_split="test",
+                        user_provider=TAU_USER_PROVIDER,
+                        task_index=task_id
+                    )
+                    return await _run_attempt(attempt_num, attempt_env)
+
+            attempts = list(await asyncio.gather(
+                *[_bounded_attempt(i) for i in range(k)]
+            ))
+            attempts.sort(key=lambda a: a["attempt"])
+        else:
+            attempts = []
+            for attempt_num in range(k):
+                # Optionally reset white agent to prevent state pollution (safer to rely on new context_id)
+                if reset_between_attempts:
+                    try:
+                        logger.info(f"[RESET] Resetting white agent before attempt {attempt_num + 1}")
+                        print(f"[RESET] Resetting white agent before attempt {attempt_num + 1}", file=sys.stderr, flush=True)
+                        reset_result = await reset_white_agent(white_agent_url, timeout=30.0)
+                        if reset_result["success"]:
+                            logger.info("[RESET] White agent reset completed successfully")
+                            print("[RESET] White agent reset completed successfully", file=sys.stderr, flush=True)
+                        else:
+                            logger.warning(f"[RESET] Reset returned failure but continuing: {reset_result.get('error')}")
+                            print(f"[RESET] Reset failed but continuing: {reset_result.get('error')}", file=sys.stderr, flush=True)
+                    except Exception as e:
+                        logger.warning(f"[RESET] Warning: Reset failed (continuing anyway): {e}")
+                        print(f"[RESET] Warning: Reset exception (continuing anyway): {e}", file=sys.stderr, flush=True)
+
+                attempts.append(await _run_attempt(attempt_num, env))
+
+                # Early exit: once pass^k is falsified AND pass^(k/2) is decided
+                # either way, the remaining attempts can't change either metric -
+                # each one is a full episode of LLM calls saved.
+                if early_exit:
+                    flags = [a["success"] for a in attempts]
+                    if not all(flags):
+                        window_found = _has_success_run(flags, k_half)
+                        trailing_run = 0
+                        for flag in reversed(flags):
+                            if not flag:
+                                break
+                            trailing_run += 1
+                        remaining = k - len(flags)
+                        if window_found or trailing_run + remaining < k_half:
+                            logger.info(
+                                f"[EARLY EXIT] Metrics decided after {len(flags)}/{k} attempts "
+                                f"(pass^{k}=False, pass^{k_half}={window_found}); skipping the rest"
+                            )
+                            break
+
+                # Small delay between attempts to prevent resource exhaustion
+                if attempt_num < k - 1:
+                    _invalidate_agent_card(white_agent_url)
+                    await asyncio.sleep(2.0)
+    finally:
+        release_env()
+
+    failure_reasons = [
+        a["failure_detail"]["category"]
+        for a in attempts
+        if not a["success"] and a["failure_detail"]
+    ]
+    total_steps = sum(a["steps"] for a in attempts)
+
     # Calculate pass^k metrics
     success_flags = [a["success"] for a in attempts]
 
@@ -1104,15 +1462,12 @@ User message: {obs}
     pass_k = all(success_flags[0:k])
 
     # pass^(k/2): Any window of k/2 consecutive successes
-    k_half = k // 2
-    pass_k_half = any(
-        all(success_flags[i:i+k_half])
-        for i in range(len(success_flags) - k_half + 1)
-    )
+    pass_k_half = _has_success_run(success_flags, k_half)
 
-    # Overall success rate
+    # Overall success rate, over the attempts actually executed (fewer than
+    # k only when early_exit stopped the run)
     num_successes = sum(success_flags)
-    success_rate = num_successes / k
+    success_rate = num_successes / len(attempts) if attempts else 0.0
 
     # Average steps (only for successful attempts)
     successful_attempts = [a for a in attempts if a["success"]]
@@ -1121,10 +1476,8 @@ User message: {obs}
         if successful_attempts else 0
     )
 
-    # Failure breakdown
-    failure_breakdown = {}
-    for reason in failure_reasons:
-        failure_breakdown[reason] = failure_breakdown.get(reason, 0) + 1
+    # Failure breakdown (Counter counts in a single C-level pass)
+    failure_breakdown = dict(Counter(failure_reasons))
 
     # Compile results
     results = {
@@ -1135,7 +1488,7 @@ User message: {obs}
         "pass_k_half": pass_k_half,
         "success_rate": success_rate,
         "num_successes": num_successes,
-        "num_failures": k - num_successes,
+        "num_failures": len(attempts) - num_successes,
         "avg_steps_on_success": avg_steps,
         "total_steps": total_steps,
         "attempts": attempts,
@@ -1151,10 +1504,9 @@ User message: {obs}
 
     # Report detailed breakdown to AgentBeats with a safety timeout
     if battle_context:
-        import asyncio as _asyncio
         try:
-            await _asyncio.wait_for(report_pass_k_results(results, battle_context), timeout=20.0)
-        except _asyncio.TimeoutError:
+            await asyncio.wait_for(report_pass_k_results(results, battle_context), timeout=20.0)
+        except asyncio.TimeoutError:
             logger.warning("[FINALIZE] Reporting results to AgentBeats timed out after 20s; returning results anyway.")
 
     return results
@@ -1214,29 +1566,29 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
         "max_steps_reached": False
     }
 
-    logger.info(f"[DEBUG extract_failure_details] Called with error={error}")
-    logger.info(f"[DEBUG extract_failure_details] info has keys: {list(info.keys())}")
+    logger.debug("[extract_failure_details] Called with error=%s", error)
+    logger.debug("[extract_failure_details] info has keys: %s", info.keys())
 
     # Extract task information
     task_info = info.get("task", {})
     if task_info:
-        logger.info(f"[DEBUG extract_failure_details] Found task_info with keys: {list(task_info.keys())}")
+        logger.debug("[extract_failure_details] Found task_info with keys: %s", task_info.keys())
         failure_detail["task_instruction"] = task_info.get("instruction", "")
         failure_detail["expected_outputs"] = task_info.get("outputs", [])
         failure_detail["ground_truth_actions"] = task_info.get("actions", [])
     else:
-        logger.info("[DEBUG extract_failure_details] No task_info found")
+        logger.debug("[extract_failure_details] No task_info found")
 
     # Extract steps completed
     if "steps_completed" in info:
         failure_detail["steps_completed"] = info["steps_completed"]
-        logger.info(f"[DEBUG extract_failure_details] Steps completed: {info['steps_completed']}")
+        logger.debug("[extract_failure_details] Steps completed: %s", info['steps_completed'])
 
     # ========================================================================
     # STEP 1: Check for explicit errors (environment/communication failures)
     # ========================================================================
     if error:
-        logger.info(f"[DEBUG extract_failure_details] Processing explicit error: {error}")
+        logger.debug("[extract_failure_details] Processing explicit error: %s", error)
         failure_detail["fault_author"] = "environment"  # Communication/system errors
 
         if "timeout" in error.lower():
@@ -1267,17 +1619,17 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
             failure_detail["fault_author"] = "agent"
             failure_detail["description"] = f"Agent error: {error}"
 
-        logger.info(f"[DEBUG extract_failure_details] Categorized as: {failure_detail['category']}")
+        logger.debug("[extract_failure_details] Categorized as: %s", failure_detail['category'])
         return failure_detail
 
     # ========================================================================
     # STEP 2: Analyze tau-bench reward information
     # ========================================================================
     reward_info = info.get("reward_info", {})
-    logger.info(f"[DEBUG extract_failure_details] reward_info exists: {bool(reward_info)}")
+    logger.debug("[extract_failure_details] reward_info exists: %s", bool(reward_info))
 
     if not reward_info:
-        logger.info("[DEBUG extract_failure_details] No reward_info found - cannot extract detailed failure info")
+        logger.debug("[extract_failure_details] No reward_info found - cannot extract detailed failure info")
         if "steps_completed" in info:
             failure_detail["category"] = "task_incomplete"
             failure_detail["fault_author"] = "agent"
@@ -1286,13 +1638,13 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
         return failure_detail
 
     reward_detail = reward_info.get("info", {})
-    logger.info(f"[DEBUG extract_failure_details] reward_detail keys: {list(reward_detail.keys())}")
+    logger.debug("[extract_failure_details] reward_detail keys: %s", reward_detail.keys())
 
     # Extract ground truth actions from reward_info
     gt_actions = reward_info.get("actions", [])
     if gt_actions:
         failure_detail["ground_truth_actions"] = gt_actions
-        logger.info(f"[DEBUG extract_failure_details] Ground truth actions: {len(gt_actions)} actions")
+        logger.debug("[extract_failure_details] Ground truth actions: %s actions", len(gt_actions))
 
     # ========================================================================
     # STEP 3: Analyze r_actions (Database State Correctness)
@@ -1306,12 +1658,12 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
     if "r_actions" in reward_detail:
         action_score = float(reward_detail["r_actions"])
         failure_detail["action_score"] = action_score
-        logger.info(f"[DEBUG extract_failure_details] Found r_actions: {action_score}")
+        logger.debug("[extract_failure_details] Found r_actions: %s", action_score)
 
         # Extract data hashes if available
         if "gt_data_hash" in reward_detail:
             failure_detail["ground_truth_data_hash"] = reward_detail["gt_data_hash"]
-            logger.info(f"[DEBUG extract_failure_details] Ground truth hash: {reward_detail['gt_data_hash'][:16]}...")
+            logger.debug("[extract_failure_details] Ground truth hash: %.16s...", reward_detail['gt_data_hash'])
 
         failure_detail["database_state_match"] = (action_score == 1.0)
 
@@ -1368,8 +1720,8 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
                             f"(e.g., wrong IDs, wrong values, wrong parameters)."
                         )
 
-            logger.info(f"[DEBUG extract_failure_details] Set category to {failure_detail['category']} (r_actions=0.0)")
-            logger.info(f"[DEBUG extract_failure_details] Fault type: {failure_detail['fault_type']}")
+            logger.debug("[extract_failure_details] Set category to %s (r_actions=0.0)", failure_detail['category'])
+            logger.debug("[extract_failure_details] Fault type: %s", failure_detail['fault_type'])
 
     # ========================================================================
     # STEP 4: Analyze r_outputs (Required Information Output)
@@ -1383,7 +1735,7 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
     if "r_outputs" in reward_detail:
         output_score = float(reward_detail["r_outputs"])
         failure_detail["output_score"] = output_score
-        logger.info(f"[DEBUG extract_failure_details] Found r_outputs: {output_score}")
+        logger.debug("[extract_failure_details] Found r_outputs: %s", output_score)
 
         # Get per-output details if available
         outputs_dict = reward_detail.get("outputs", {})
@@ -1397,8 +1749,8 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
             failure_detail["provided_outputs"] = provided
             failure_detail["missing_outputs"] = missing
 
-            logger.info(f"[DEBUG extract_failure_details] Provided outputs: {provided}")
-            logger.info(f"[DEBUG extract_failure_details] Missing outputs: {missing}")
+            logger.debug("[extract_failure_details] Provided outputs: %s", provided)
+            logger.debug("[extract_failure_details] Missing outputs: %s", missing)
 
         if output_score == 0.0:
             # Agent failed to communicate required information
@@ -1422,10 +1774,10 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
                         f"required output(s). Missing: {', '.join(failure_detail['missing_outputs'])}"
                     )
 
-                logger.info("[DEBUG extract_failure_details] Set category to missing_required_outputs")
+                logger.debug("[extract_failure_details] Set category to missing_required_outputs")
         elif output_score < 1.0:
             # Partial output (unusual, but handle it)
-            logger.info(f"[DEBUG extract_failure_details] Partial r_outputs: {output_score}")
+            logger.debug("[extract_failure_details] Partial r_outputs: %s", output_score)
             if failure_detail["category"] == "unknown_failure":
                 failure_detail["fault_author"] = "agent"
                 failure_detail["category"] = "incomplete_outputs"
@@ -1443,7 +1795,7 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
     if "r_constraints" in reward_detail:
         constraint_score = float(reward_detail["r_constraints"])
         failure_detail["constraint_score"] = constraint_score
-        logger.info(f"[DEBUG extract_failure_details] Found r_constraints: {constraint_score}")
+        logger.debug("[extract_failure_details] Found r_constraints: %s", constraint_score)
 
         if constraint_score < 1.0:
             if failure_detail["category"] == "unknown_failure":
@@ -1454,7 +1806,7 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
                     f"Agent violated task constraints or rules (score: {constraint_score}). "
                     f"For example: didn't confirm user ID, didn't get authorization, etc."
                 )
-                logger.info("[DEBUG extract_failure_details] Set category to constraint_violation")
+                logger.debug("[extract_failure_details] Set category to constraint_violation")
 
     # ========================================================================
     # STEP 6: Finalize unknown failures
@@ -1465,11 +1817,11 @@ def extract_failure_details(info: Dict[str, Any], error: Optional[str]) -> Dict[
             "Failure occurred but root cause could not be determined. "
             "Reward was 0.0 but no specific failure indicators found."
         )
-        logger.info("[DEBUG extract_failure_details] Kept as unknown_failure (fallback)")
+        logger.debug("[extract_failure_details] Kept as unknown_failure (fallback)")
 
-    logger.info(f"[DEBUG extract_failure_details] Final category: {failure_detail['category']}")
-    logger.info(f"[DEBUG extract_failure_details] Fault author: {failure_detail['fault_author']}")
-    logger.info(f"[DEBUG extract_failure_details] Fault type: {failure_detail['fault_type']}")
+    logger.debug("[extract_failure_details] Final category: %s", failure_detail['category'])
+    logger.debug("[extract_failure_details] Fault author: %s", failure_detail['fault_author'])
+    logger.debug("[extract_failure_details] Fault type: %s", failure_detail['fault_type'])
     return failure_detail
 
 
@@ -5,9 +5,15 @@ import sys
 sys.path.insert(0, '/Users/max/Documents/Uni/Berkeley/agentic_ai/tau-bench-agents')
 from implementations.mcp.shared_config import TAU_USER_MODEL, TAU_USER_PROVIDER
 
+import asyncio
+import hashlib
+import json
 import logging
+import orjson
+import os
 import uvicorn
 import dotenv
+from collections import OrderedDict
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.agent_execution import AgentExecutor, RequestContext
@@ -15,19 +21,97 @@ from a2a.server.events import EventQueue
 from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentSkill, AgentCard, AgentCapabilities
 from a2a.utils import new_agent_text_message
-from litellm import completion
+from litellm import acompletion
+from starlette.responses import Response
+from starlette.routing import Route
+
+# Use uvloop's libuv-based event loop when available - every hot path here
+# (LLM completion, event_queue, A2A round-trips) is async I/O bound.
+try:
+    import uvloop  # noqa: F401
+    UVICORN_LOOP = "uvloop"
+except ImportError:
+    UVICORN_LOOP = "asyncio"
 
 # Set up logging
 logger = logging.getLogger("white_agent")
 
 # Safety: limit message history to prevent context overflow while maintaining coherence
 # Claude Haiku has ~200K context, set conservative limit
-# Each tau-bench attempt should complete in <30 steps, so 60 messages is plenty
-MAX_MESSAGES_IN_HISTORY = 60  # Keep last 60 messages (30 exchanges) + system prompt
+# Each tau-bench attempt should complete in <30 steps, so 60 messages is plenty.
+# The window is a stable prefix: as long as it doesn't slide, provider prefix
+# caching keeps firing across turns (see the prefix-hash debug log below).
+MAX_MESSAGES_IN_HISTORY = int(os.getenv("WHITE_AGENT_HISTORY_WINDOW", "60"))
+
+# Static system prompt shared by every context. Marking the block with
+# cache_control lets LiteLLM forward it as an ephemeral prefix-cache entry
+# (Anthropic/Bedrock); OpenAI's automatic prefix cache fires because the
+# system message is the first, stable block of every request. Subsequent
+# turns then only pay prefill for the new tokens instead of the full history.
+SYSTEM_PROMPT = "You are a helpful retail customer service agent. When you need to take an action or respond to the user, you should format your response with the action/response wrapped in <json>...</json> tags as specified in the instructions. The JSON should contain 'name' (the function name or 'respond') and 'kwargs' (the arguments or message content)."
+
+SYSTEM_CONTENT = [
+    {
+        "type": "text",
+        "text": SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+# Conversation storage: slotted message objects instead of per-turn dicts.
+# A _Msg is roughly half the size of the equivalent dict and, with the role
+# strings interned, role comparisons are pointer compares. The dict-shaped
+# payload LiteLLM expects is rebuilt per request from this compact form.
+_ROLE_SYSTEM = sys.intern("system")
+_ROLE_USER = sys.intern("user")
+_ROLE_ASSISTANT = sys.intern("assistant")
+
+
+class _Msg:
+    __slots__ = ("role", "content")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
 
 
 dotenv.load_dotenv()
 
+# Response cache for deterministic completions: with temperature=0 the
+# (model, messages) -> response mapping is deterministic, so re-runs of the
+# same tau-bench task (common during development) can reuse earlier
+# completions instead of re-paying LLM latency and token cost.
+# Opt-in via WHITE_AGENT_RESPONSE_CACHE=1 for dev re-runs only: the step-1
+# prompt is byte-stable across pass@k attempts, so with the cache on every
+# attempt replays attempt 1's first completion and the attempts stop being
+# independent samples.
+RESPONSE_CACHE_ENABLED = os.getenv("WHITE_AGENT_RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = 512
+_response_cache: OrderedDict = OrderedDict()
+
+# Cap on concurrently in-flight completions. Chat-completion providers
+# (OpenAI/OpenRouter) expose no server-side batch endpoint, so concurrent
+# pass@k attempts are simply gathered over LiteLLM's shared client; the
+# semaphore keeps a burst of attempts from tripping provider rate limits.
+MAX_INFLIGHT_LLM_CALLS = int(os.getenv("WHITE_AGENT_MAX_INFLIGHT_LLM", "8"))
+_llm_semaphore = None
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(MAX_INFLIGHT_LLM_CALLS)
+    return _llm_semaphore
+
+
+def _response_cache_key(model: str, messages: list, temperature: float) -> str:
+    payload = orjson.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
 
 def prepare_white_agent_card(url):
     skill = AgentSkill(
@@ -52,7 +136,9 @@ def prepare_white_agent_card(url):
 
 class GeneralWhiteAgentExecutor(AgentExecutor):
     def __init__(self):
-        self.ctx_id_to_messages = {}
+        # LRU-ordered: most recently touched context last, so eviction always
+        # drops the context that has been idle the longest
+        self.ctx_id_to_messages: OrderedDict = OrderedDict()
         self.max_contexts = 20  # Prevent unbounded memory growth (allow up to 10 concurrent contexts)
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
@@ -61,45 +147,39 @@ class GeneralWhiteAgentExecutor(AgentExecutor):
         
         ## Use in case white agent fails again
 
-        # Check if this is a battle_info notification (should be ignored by white agent)
-        try:
-            import json
-            battle_data = json.loads(user_input)
-            if battle_data.get("type") == "battle_info":
-                # This is just a notification, acknowledge and return
-                await event_queue.enqueue_event(
-                    new_agent_text_message("Battle info received, ready for battle", context_id=context.context_id)
-                )
-                return
-        except (json.JSONDecodeError, KeyError, ValueError):
-            # Not JSON or not battle_info, proceed normally
-            pass
+        # Check if this is a battle_info notification (should be ignored by white agent).
+        # Task messages are plain text, so only attempt json.loads when the
+        # input actually starts with a JSON object/array.
+        if user_input.lstrip()[:1] in "{[":
+            try:
+                battle_data = orjson.loads(user_input)
+                if battle_data.get("type") == "battle_info":
+                    # This is just a notification, acknowledge and return
+                    await event_queue.enqueue_event(
+                        new_agent_text_message("Battle info received, ready for battle", context_id=context.context_id)
+                    )
+                    return
+            except (json.JSONDecodeError, KeyError, ValueError):
+                # Not battle_info, proceed normally
+                pass
         
         if context.context_id not in self.ctx_id_to_messages:
-            # Security: Limit memory growth - clear oldest contexts if too many
-            if len(self.ctx_id_to_messages) >= self.max_contexts:
-                oldest_context = next(iter(self.ctx_id_to_messages))
-                del self.ctx_id_to_messages[oldest_context]
+            # Security: Limit memory growth - evict least-recently-used contexts
+            while len(self.ctx_id_to_messages) >= self.max_contexts:
+                oldest_context, _ = self.ctx_id_to_messages.popitem(last=False)
                 print(f"[White Agent] Cleared old context {oldest_context} to prevent memory leak (max={self.max_contexts})")
 
-            # Initialize with system prompt to enforce JSON format
+            # Initialize with the cacheable system prompt to enforce JSON format
             print(f"[White Agent] Creating NEW context: {context.context_id}")
-            self.ctx_id_to_messages[context.context_id] = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful retail customer service agent. When you need to take an action or respond to the user, you should format your response with the action/response wrapped in <json>...</json> tags as specified in the instructions. The JSON should contain 'name' (the function name or 'respond') and 'kwargs' (the arguments or message content)."
-                }
-            ]
+            # SYSTEM_CONTENT is shared (never mutated), so every context can
+            # reference the same list.
+            self.ctx_id_to_messages[context.context_id] = [_Msg(_ROLE_SYSTEM, SYSTEM_CONTENT)]
         else:
+            self.ctx_id_to_messages.move_to_end(context.context_id)
             print(f"[White Agent] Reusing existing context: {context.context_id} (currently {len(self.ctx_id_to_messages[context.context_id])} messages)")
             
         messages = self.ctx_id_to_messages[context.context_id]
-        messages.append(
-            {
-                "role": "user",
-                "content": user_input,
-            }
-        )
+        messages.append(_Msg(_ROLE_USER, user_input))
 
         # Smart trimming: Keep system message + last N messages (sliding window)
         # This maintains recent context while preventing unbounded growth
@@ -110,7 +190,22 @@ class GeneralWhiteAgentExecutor(AgentExecutor):
             messages = [system_msg] + recent_messages
             self.ctx_id_to_messages[context.context_id] = messages
             print(f"[White Agent] Trimmed history to {len(messages)} messages (kept system + last {MAX_MESSAGES_IN_HISTORY})")
-        
+
+        # Dict-shaped copy of the history for LiteLLM; the _Msg form stays the
+        # long-lived representation.
+        payload_messages = [{"role": m.role, "content": m.content} for m in messages]
+
+        # Observability for provider prefix caching: the hash of everything
+        # before the newest message should stay a prefix of the previous
+        # turn's payload - if it changes unexpectedly, the prefix cache is
+        # being invalidated (e.g. by the window sliding)
+        if logger.isEnabledFor(logging.DEBUG):
+            prefix_hash = hashlib.sha256(
+                orjson.dumps(payload_messages[:-1], option=orjson.OPT_SORT_KEYS)
+            ).hexdigest()
+            logger.debug(f"[CACHE] ctx={context.context_id} prefix_hash={prefix_hash[:16]}")
+
+
         # Use the globally configured model from shared_config
         print(f"[White Agent] Using model: {TAU_USER_MODEL}, provider: {TAU_USER_PROVIDER}")
         
@@ -118,23 +213,63 @@ class GeneralWhiteAgentExecutor(AgentExecutor):
         # With litellm.drop_params=True, unsupported params will be dropped automatically
         temperature = 1.0 if "gpt-5" in TAU_USER_MODEL.lower() else 0.0
         print(f"[White Agent] Using temperature: {temperature}")
-        
-        # Add timeout protection to prevent hanging on LLM calls
-        import asyncio
+
+        # Deterministic completions (temperature=0) can be served from cache
+        cache_key = None
+        if RESPONSE_CACHE_ENABLED and temperature == 0.0:
+            cache_key = _response_cache_key(TAU_USER_MODEL, payload_messages, temperature)
+            cached_content = _response_cache.get(cache_key)
+            if cached_content is not None:
+                _response_cache.move_to_end(cache_key)
+                print(f"[White Agent] Response cache HIT ({cache_key[:12]}...), skipping LLM call")
+                messages.append(_Msg(_ROLE_ASSISTANT, cached_content))
+                await event_queue.enqueue_event(
+                    new_agent_text_message(cached_content, context_id=context.context_id)
+                )
+                return
+
+        async def _stream_completion() -> str:
+            # acompletion is natively async (httpx under the hood), so the
+            # event loop stays free for other contexts instead of parking a
+            # worker thread on the LLM round-trip. Streaming lets us stop
+            # paying for tokens as soon as the action block is complete:
+            # the green agent only consumes the <json>...</json> part, so
+            # anything generated after the closing tag is wasted.
+            async with _get_llm_semaphore():
+                response_stream = await acompletion(
+                    model=TAU_USER_MODEL,
+                    messages=payload_messages,
+                    temperature=temperature,
+                    stream=True,
+                )
+                buf = []
+                tail = ""
+                try:
+                    async for chunk in response_stream:
+                        delta = chunk.choices[0].delta.content or ""
+                        if not delta:
+                            continue
+                        buf.append(delta)
+                        tail = (tail + delta)[-32:]
+                        if "</json>" in tail:
+                            break
+                finally:
+                    # The early break (the common case) abandons the stream
+                    # mid-response; close it so the provider connection is
+                    # released now instead of whenever GC gets to it
+                    if hasattr(response_stream, "aclose"):
+                        await response_stream.aclose()
+                return "".join(buf)
+
         try:
             logger.info(f"[API] >>> Sending LLM request: model={TAU_USER_MODEL}, messages={len(messages)}, temp={temperature}")
             print(f"[White Agent API] >>> Sending LLM request: model={TAU_USER_MODEL}, messages={len(messages)}, temp={temperature}", file=sys.stderr, flush=True)
-            response = await asyncio.wait_for(
-                asyncio.to_thread(
-                    completion,
-                    model=TAU_USER_MODEL,
-                    messages=messages,
-                    temperature=temperature,
-                ),
+            content = await asyncio.wait_for(
+                _stream_completion(),
                 timeout=60.0  # 60 second timeout for LLM completion
             )
-            logger.info(f"[API] <<< Received LLM response: {len(response.choices[0].message.content or '')} chars")
-            print(f"[White Agent API] <<< Received LLM response: {len(response.choices[0].message.content or '')} chars", file=sys.stderr, flush=True)
+            logger.info(f"[API] <<< Received LLM response: {len(content)} chars")
+            print(f"[White Agent API] <<< Received LLM response: {len(content)} chars", file=sys.stderr, flush=True)
         except asyncio.TimeoutError:
             error_msg = "LLM completion timed out after 60 seconds"
             logger.error(f"[API] XXX {error_msg}")
@@ -148,20 +283,19 @@ class GeneralWhiteAgentExecutor(AgentExecutor):
             )
             return
 
-        next_message = response.choices[0].message.model_dump()  # type: ignore
-        messages.append(
-            {
-                "role": "assistant",
-                "content": next_message["content"],
-            }
-        )
+        # Populate the deterministic response cache (LRU-bounded)
+        if cache_key is not None and content:
+            _response_cache[cache_key] = content
+            _response_cache.move_to_end(cache_key)
+            while len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                _response_cache.popitem(last=False)
+
+        messages.append(_Msg(_ROLE_ASSISTANT, content))
         # Instrumentation: log enqueue progress and catch any issues explicitly
         logger.info("[EXEC] Enqueueing response event to event_queue")
         try:
             await event_queue.enqueue_event(
-                new_agent_text_message(
-                    next_message["content"], context_id=context.context_id
-                )
+                new_agent_text_message(content, context_id=context.context_id)
             )
             logger.info("[EXEC] Enqueue completed; returning from executor")
             return
@@ -184,7 +318,7 @@ class GeneralWhiteAgentExecutor(AgentExecutor):
     async def reset(self, context: RequestContext) -> None:
         """Reset the agent state. Called by AgentBeats before each battle."""
         # Clear ALL conversation history to prevent any memory leakage
-        self.ctx_id_to_messages = {}
+        self.ctx_id_to_messages = OrderedDict()
         print("[SECURITY] White agent memory completely cleared (reset called)")
 
 
@@ -232,4 +366,17 @@ def start_white_agent(agent_name="general_white_agent", host="localhost", port=9
         http_handler=request_handler,
     )
 
-    uvicorn.run(app.build(), host=host, port=port)
+    starlette_app = app.build()
+
+    # The green agent polls the agent card while waiting for the server to
+    # come up (and re-fetches it after restarts); serve pre-serialized bytes
+    # instead of re-running Pydantic serialization on every fetch.
+    card_bytes = card.model_dump_json(exclude_none=True).encode()
+
+    async def _serve_card(request):
+        return Response(content=card_bytes, media_type="application/json")
+
+    for card_path in ("/.well-known/agent-card.json", "/.well-known/agent.json"):
+        starlette_app.router.routes.insert(0, Route(card_path, _serve_card, methods=["GET"]))
+
+    uvicorn.run(starlette_app, host=host, port=port, loop=UVICORN_LOOP)
@@ -22,6 +22,14 @@ from a2a.types import AgentSkill, AgentCard, AgentCapabilities
 from a2a.utils import new_agent_text_message
 from litellm import completion
 
+# Use uvloop's libuv-based event loop when available - every hot path here
+# (LLM completion, event_queue, A2A round-trips) is async I/O bound.
+try:
+    import uvloop  # noqa: F401
+    UVICORN_LOOP = "uvloop"
+except ImportError:
+    UVICORN_LOOP = "asyncio"
+
 # Set up logging
 logger = logging.getLogger("white_agent_reasoning")
 
@@ -63,19 +71,22 @@ class ReasoningWhiteAgentExecutor(AgentExecutor):
         # parse the task
         user_input = context.get_user_input()
 
-        # Check if this is a battle_info notification (should be ignored by white agent)
-        try:
-            import json
-            battle_data = json.loads(user_input)
-            if battle_data.get("type") == "battle_info":
-                # This is just a notification, acknowledge and return
-                await event_queue.enqueue_event(
-                    new_agent_text_message("Battle info received, ready for battle", context_id=context.context_id)
-                )
-                return
-        except (json.JSONDecodeError, KeyError, ValueError):
-            # Not JSON or not battle_info, proceed normally
-            pass
+        # Check if this is a battle_info notification (should be ignored by white agent).
+        # Task messages are plain text, so only attempt json.loads when the
+        # input actually starts with a JSON object/array.
+        if user_input.lstrip()[:1] in "{[":
+            try:
+                import json
+                battle_data = json.loads(user_input)
+                if battle_data.get("type") == "battle_info":
+                    # This is just a notification, acknowledge and return
+                    await event_queue.enqueue_event(
+                        new_agent_text_message("Battle info received, ready for battle", context_id=context.context_id)
+                    )
+                    return
+            except (json.JSONDecodeError, KeyError, ValueError):
+                # Not battle_info, proceed normally
+                pass
 
         if context.context_id not in self.ctx_id_to_messages:
             # Security: Limit memory growth - clear oldest contexts if too many
@@ -276,7 +287,7 @@ def start_white_agent(agent_name="reasoning_white_agent", host="localhost", port
         http_handler=request_handler,
     )
 
-    uvicorn.run(app.build(), host=host, port=port)
+    uvicorn.run(app.build(), host=host, port=port, loop=UVICORN_LOOP)
 
 
 if __name__ == "__main__":